@@ -0,0 +1,66 @@
+"""
+Compara los backends de `billboard.parse_hot_100` (`html.parser` de BeautifulSoup
+y el selector XPath compilado de lxml) sobre páginas de charts.
+
+Uso:
+    python -m benchmarks.bench_billboard --repeat 5
+    python -m benchmarks.bench_billboard --html-dir api_data/billboard_html
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_chart_html
+from classes.billboard import parse_hot_100
+
+
+def load_pages(html_dir, pages):
+    # Páginas guardadas por `crawl_hot_100`, o sintéticas si no se indica directorio
+    if html_dir:
+        paths = sorted(glob.glob(os.path.join(html_dir, "*.html")))[:pages]
+        if not paths:
+            raise SystemExit(f"No hay archivos .html en {html_dir}")
+
+        pages_html = []
+        for path in paths:
+            with open(path, encoding="utf-8") as fp:
+                pages_html.append(fp.read())
+
+        return pages_html
+
+    return [synthetic_chart_html() for _ in range(pages)]
+
+
+def measure(parser, pages_html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        charts = [parse_hot_100(html, parser=parser) for html in pages_html]
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), charts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--html-dir", default=None)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages_html = load_pages(args.html_dir, args.pages)
+    bs4_time, expected = measure("html.parser", pages_html, args.repeat)
+    lxml_time, result = measure("lxml", pages_html, args.repeat)
+
+    # Ambos backends deben producir exactamente los mismos charts
+    for expected_chart, chart in zip(expected, result):
+        pd.testing.assert_frame_equal(expected_chart, chart)
+
+    print(f"pages:           {len(pages_html)}")
+    print(f"html.parser:     {bs4_time / len(pages_html) * 1000:.1f} ms/page")
+    print(f"lxml:            {lxml_time / len(pages_html) * 1000:.1f} ms/page")
+    print(f"speedup:         {bs4_time / lxml_time:.2f}x")
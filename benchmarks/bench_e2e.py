@@ -0,0 +1,198 @@
+"""
+Benchmark de punta a punta contra el mock local de la API (`benchmarks/mock_server.py`):
+ejecuta `SpotifyAPI.playlist_data` y `main.py` completos, reporta el throughput
+(tracks/s) y la latencia p95 por endpoint, y marca las regresiones respecto de
+una ejecución anterior guardada con `--save-baseline`.
+
+Uso:
+    python -m benchmarks.bench_e2e --playlists 5 --tracks 2000 --latency-ms 20 --save-baseline api_data/bench_e2e.json
+    python -m benchmarks.bench_e2e --playlists 5 --tracks 2000 --latency-ms 20 --baseline api_data/bench_e2e.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_server import (
+    MockSpotifyServer,
+    add_mock_arguments,
+    mock_api,
+    parse_sizes,
+    playlist_id,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port, args):
+    # El mock corre en otro proceso para no competir por el GIL con el cliente
+    MockSpotifyServer(mock_api(args), port=port).httpd.serve_forever()
+
+
+def wait_for(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+
+    raise SystemExit("El mock no empezó a escuchar a tiempo")
+
+
+def latency_p95(metrics_report):
+    return {
+        endpoint: stats["latency_p95"] for endpoint, stats in metrics_report.items()
+    }
+
+
+def bench_playlist_data(args, n_playlists, n_tracks):
+    from classes.metrics import RequestMetrics
+    from classes.scheduler import RequestScheduler
+    from classes.spotify import SpotifyAPI
+
+    spotify = SpotifyAPI(
+        scheduler=RequestScheduler(rate=args.rate), metrics=RequestMetrics()
+    )
+
+    start = time.perf_counter()
+    for index in range(n_playlists):
+        spotify.playlist_data(playlist_id(index))
+    seconds = time.perf_counter() - start
+
+    return {
+        "tracks": n_tracks,
+        "seconds": round(seconds, 3),
+        "tracks_per_s": round(n_tracks / seconds, 1),
+        "latency_p95": latency_p95(spotify.metrics.report()),
+    }
+
+
+def bench_main(args, n_tracks):
+    metrics_path = os.path.abspath("main_metrics.json")
+    command = [sys.executable, os.path.join(ROOT, "main.py"), "--rate",
+               str(args.rate), "--metrics", metrics_path] + shlex.split(args.main_args)  # fmt: skip
+
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    seconds = time.perf_counter() - start
+
+    with open(metrics_path) as fp:
+        metrics_report = json.load(fp)
+
+    return {
+        "tracks": n_tracks,
+        "seconds": round(seconds, 3),
+        "tracks_per_s": round(n_tracks / seconds, 1),
+        "latency_p95": latency_p95(metrics_report),
+    }
+
+
+def regressions(results, baseline, threshold):
+    found = []
+    for scenario, result in results.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            continue
+
+        if result["tracks_per_s"] < previous["tracks_per_s"] * (1 - threshold):
+            found.append(
+                f"{scenario}: throughput {previous['tracks_per_s']} -> "
+                f"{result['tracks_per_s']} tracks/s"
+            )
+
+        for endpoint, p95 in result["latency_p95"].items():
+            before = previous["latency_p95"].get(endpoint)
+            # Ignorar variaciones de menos de 1 ms
+            if before is not None and p95 > before * (1 + threshold) + 0.001:
+                found.append(f"{scenario}: p95 {endpoint} {before} -> {p95} s")
+
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_mock_arguments(parser)
+    parser.add_argument(
+        "--scenario", choices=["playlist_data", "main", "all"], default="all"
+    )
+    parser.add_argument("--rate", type=float, default=1000.0,
+                        help="Solicitudes por segundo del scheduler (10 en una ejecución real)")  # fmt: skip
+    parser.add_argument("--main-args", default="",
+                        help='Argumentos extra para main.py, por ejemplo "--async"')  # fmt: skip
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--save-baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Variación relativa tolerada antes de marcar una regresión")  # fmt: skip
+    args = parser.parse_args()
+
+    # Las rutas se resuelven antes de cambiar de directorio
+    for name in ("baseline", "save_baseline"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    sizes = parse_sizes(args)
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(port, args), daemon=True)
+    server.start()
+    wait_for(port)
+
+    os.environ["SPOTIFY_API_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["SPOTIFY_ACCESS_TOKEN"] = "mock"
+    sys.path.insert(0, ROOT)
+
+    results = {}
+    try:
+        # Cada escenario escribe `api_data` en su propio directorio temporal
+        for scenario in ["playlist_data", "main"]:
+            if args.scenario not in (scenario, "all"):
+                continue
+
+            with tempfile.TemporaryDirectory() as workdir:
+                os.chdir(workdir)
+                if scenario == "playlist_data":
+                    results[scenario] = bench_playlist_data(
+                        args, len(sizes), sum(sizes)
+                    )
+                else:
+                    results[scenario] = bench_main(args, sum(sizes))
+                os.chdir(ROOT)
+    finally:
+        server.terminate()
+
+    for scenario, result in results.items():
+        print(
+            f"{scenario:<15}{result['tracks']:>8} tracks  {result['seconds']:>8.2f} s"
+            f"  {result['tracks_per_s']:>10.1f} tracks/s"
+        )
+        for endpoint, p95 in result["latency_p95"].items():
+            print(f"    p95 {endpoint:<40}{p95 * 1000:>8.1f} ms")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fp:
+            json.dump(results, fp, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            found = regressions(results, json.load(fp), args.threshold)
+
+        for regression in found:
+            print("REGRESIÓN:", regression)
+
+        if found:
+            sys.exit(1)
+        print("Sin regresiones respecto de", args.baseline)
@@ -0,0 +1,60 @@
+"""
+Compara el aplanado en tres pasadas (`album_data`, `artist_data`, `songs_data`)
+con el aplanado columnar en una pasada (`flatten_playlist`).
+
+Uso:
+    python -m benchmarks.bench_flatten --tracks 50000 --repeat 5
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_playlist
+from classes import utils
+
+
+def three_pass(playlist_data):
+    album_df = pd.DataFrame.from_dict(utils.album_data(playlist_data))
+    artist_df = pd.DataFrame.from_dict(utils.artist_data(playlist_data))
+    song_df = pd.DataFrame.from_dict(utils.songs_data(playlist_data))
+
+    return album_df, artist_df, song_df
+
+
+def single_pass(playlist_data):
+    albums, artists, songs = utils.flatten_playlist(playlist_data)
+
+    return pd.DataFrame(albums), pd.DataFrame(artists), pd.DataFrame(songs)
+
+
+def best_of(function, playlist_data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(playlist_data)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    playlist_data = synthetic_playlist(args.tracks)
+
+    three_pass_time, expected = best_of(three_pass, playlist_data, args.repeat)
+    single_pass_time, result = best_of(single_pass, playlist_data, args.repeat)
+
+    # Ambos métodos deben producir exactamente las mismas tablas
+    for left, right in zip(expected, result):
+        pd.testing.assert_frame_equal(left, right)
+
+    print(f"tracks:       {args.tracks}")
+    print(f"three pass:   {three_pass_time * 1000:.1f} ms")
+    print(f"single pass:  {single_pass_time * 1000:.1f} ms")
+    print(f"speedup:      {three_pass_time / single_pass_time:.2f}x")
@@ -0,0 +1,70 @@
+"""
+Compara la unión encadenada con `pd.merge` con la unión por índices de
+`utils.merge_model_data`, en tiempo y en memoria máxima.
+
+Uso:
+    python -m benchmarks.bench_merge --tracks 100000 --repeat 3
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_audio_feature, synthetic_playlist
+from classes import utils
+
+
+def chained_merge(song_df, songs_features_df, album_df, artist_df):
+    df_1 = pd.merge(left=song_df, right=songs_features_df, on="song_id")
+    df_2 = pd.merge(left=df_1, right=album_df, on="album_id")
+
+    return pd.merge(left=df_2, right=artist_df, on="artist_id")
+
+
+def measure(function, frames, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*frames)
+        timings.append(time.perf_counter() - start)
+
+    # Memoria máxima asignada durante una ejecución
+    tracemalloc.start()
+    function(*frames)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    albums, artists, songs = utils.flatten_playlist(synthetic_playlist(args.tracks))
+    album_df = pd.DataFrame(albums).drop_duplicates(subset="album_id")
+    artist_df = pd.DataFrame(artists).drop_duplicates(subset="artist_id")
+    song_df = pd.DataFrame(songs).drop_duplicates(subset="song_id")
+    songs_features_df = pd.DataFrame(
+        [synthetic_audio_feature(song_id) for song_id in song_df["song_id"]]
+    ).rename(columns={"id": "song_id"})
+
+    frames = (song_df, songs_features_df, album_df, artist_df)
+    merge_time, merge_peak, expected = measure(chained_merge, frames, args.repeat)
+    join_time, join_peak, result = measure(utils.merge_model_data, frames, args.repeat)
+
+    # Ambos métodos deben producir exactamente la misma tabla
+    pd.testing.assert_frame_equal(expected, result)
+
+    print(f"rows:            {len(result)}")
+    print(
+        f"chained merge:   {merge_time * 1000:.1f} ms, peak {merge_peak / 2**20:.1f} MiB"
+    )
+    print(
+        f"indexed join:    {join_time * 1000:.1f} ms, peak {join_peak / 2**20:.1f} MiB"
+    )
+    print(f"speedup:         {merge_time / join_time:.2f}x")
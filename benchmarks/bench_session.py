@@ -0,0 +1,61 @@
+"""
+Compara las conexiones TCP abiertas contra el mock local de la API
+(`benchmarks/mock_server.py`) con la sesión compartida keep-alive de
+`classes/session.py` y con `keep_alive=False` (una conexión por solicitud).
+
+Uso:
+    python -m benchmarks.bench_session --requests 500 --workers 8 --latency-ms 2
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_server import MockSpotifyAPI, MockSpotifyServer, playlist_id
+from classes.auth import StaticToken
+from classes.scheduler import RequestScheduler
+from classes.session import PooledSession
+from classes.spotify import SpotifyAPI
+
+
+def bench(keep_alive, args):
+    # Un servidor nuevo por modo para contar sus conexiones desde cero
+    api = MockSpotifyAPI([100] * args.playlists, latency_ms=args.latency_ms)
+
+    with MockSpotifyServer(api) as server:
+        session = PooledSession(keep_alive=keep_alive)
+        spotify = SpotifyAPI(
+            session=session,
+            scheduler=RequestScheduler(rate=1e6, burst=1e6),
+            token_manager=StaticToken("mock"),
+            base_url=server.base_url,
+        )
+        ids = [playlist_id(index % args.playlists) for index in range(args.requests)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(spotify.playlist_info, ids))
+        seconds = time.perf_counter() - start
+
+        session.close()
+        return {**api.stats(), "seconds": seconds}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--playlists", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'session':<20}{'requests':>10}{'connections':>13}{'req/conn':>10}{'time (s)':>10}"
+    )
+    for name, keep_alive in [("keep-alive", True), ("keep_alive=False", False)]:
+        stats = bench(keep_alive, args)
+        print(
+            f"{name:<20}{stats['requests']:>10}{stats['connections']:>13}"
+            f"{stats['requests'] / max(stats['connections'], 1):>10.1f}"
+            f"{stats['seconds']:>10.2f}"
+        )
@@ -0,0 +1,80 @@
+"""
+Mide el tiempo de importación de cada módulo de `classes` en un proceso nuevo, con
+el reporte de `python -X importtime`, y el tiempo de crear una instancia de
+`SpotifyAPI` (sin autenticar).
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --module classes.spotify --top 15
+"""
+
+import argparse
+import glob
+import os
+import re
+import subprocess
+import sys
+
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module):
+    # (módulo, tiempo propio, tiempo acumulado) en microsegundos, en un proceso nuevo
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return [
+        (match.group(4), int(match.group(1)), int(match.group(2)))
+        for match in IMPORTTIME.finditer(result.stderr)
+    ]
+
+
+def construct_time(repeat):
+    # Importar el módulo y crear la instancia, sin solicitudes a la API
+    code = (
+        "import time; start = time.perf_counter(); "
+        "from classes.spotify import SpotifyAPI; SpotifyAPI(); "
+        "print(time.perf_counter() - start)"
+    )
+    timings = [
+        float(subprocess.run([sys.executable, "-c", code], capture_output=True,
+                             text=True, check=True).stdout)  # fmt: skip
+        for _ in range(repeat)
+    ]
+
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="classes.spotify")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    modules = sorted(
+        "classes." + os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join("classes", "*.py"))
+    )
+
+    print(f"{'module':<28}{'import (ms)':>12}")
+    for module in modules:
+        # El mejor de `repeat` procesos, para descontar el ruido del sistema
+        cumulative = min(
+            dict((name, total) for name, _, total in import_times(module))[module]
+            for _ in range(args.repeat)
+        )
+        print(f"{module:<28}{cumulative / 1000:>12.1f}")
+
+    print(f"\nMódulos más pesados al importar {args.module}:")
+    heaviest = sorted(import_times(args.module), key=lambda row: row[2], reverse=True)
+    for name, self_time, cumulative in heaviest[: args.top]:
+        print(
+            f"  {name:<40}{cumulative / 1000:>8.1f} ms  (propio {self_time / 1000:.1f} ms)"
+        )
+
+    print(f"\nimport + SpotifyAPI(): {construct_time(args.repeat) * 1000:.1f} ms")
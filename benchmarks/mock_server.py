@@ -0,0 +1,413 @@
+"""
+Servidor local que emula los endpoints de la API de Spotify que usa el proyecto,
+con datos sintéticos, latencia configurable e inyección de respuestas 429.
+
+Uso:
+    python -m benchmarks.mock_server --port 8765 --playlists 5 --tracks 2000 --latency-ms 20
+
+Luego, para apuntar `SpotifyAPI` (y `main.py`) al servidor:
+    SPOTIFY_API_BASE_URL=http://127.0.0.1:8765/v1 SPOTIFY_ACCESS_TOKEN=mock python main.py
+"""
+
+import argparse
+import functools
+import json
+import random
+import re
+import socket
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import synthetic_audio_feature, synthetic_track
+
+USER_ID = "mockuser"
+
+# Primer índice de los tracks sintéticos de la biblioteca del usuario
+SAVED_TRACKS = 500_000_000
+SAVED_ALBUMS = 600_000_000
+ALBUM_TRACKS = 12
+
+
+def playlist_id(index: int) -> str:
+    # IDs de 22 caracteres, como los de Spotify
+    return f"mockplaylist{index:010d}"
+
+
+class MockSpotifyAPI:
+    """
+    Datos y respuestas del servidor, independientes de HTTP.
+
+    Parameters:
+        playlist_sizes (List[int]): Cantidad de tracks de cada playlist.
+        latency_ms (float): Latencia agregada a cada respuesta, en milisegundos.
+        error_rate (float): Probabilidad de responder 429 a una solicitud.
+        retry_after (float): Valor de `Retry-After` de las respuestas 429, en segundos.
+        top_items (int): Cantidad de artistas y canciones en `/me/top/*`.
+        saved_tracks (int): Cantidad de canciones guardadas en `/me/tracks`.
+        saved_albums (int): Cantidad de álbumes guardados en `/me/albums`.
+        seed (int): Semilla de la latencia y de los 429.
+    """
+
+    def __init__(
+        self,
+        playlist_sizes: List[int],
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0.1,
+        top_items: int = 150,
+        saved_tracks: int = 0,
+        saved_albums: int = 0,
+        seed: int = 0,
+    ):
+        self.playlist_sizes = playlist_sizes
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.top_items = top_items
+        self.saved_tracks = saved_tracks
+        self.saved_albums = saved_albums
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.connections = 0
+
+        self.routes = [
+            (re.compile(r"^/v1/me$"), self.me),
+            (re.compile(r"^/v1/me/playlists$"), self.me_playlists),
+            (re.compile(r"^/v1/me/top/(artists|tracks)$"), self.me_top),
+            (re.compile(r"^/v1/me/tracks$"), self.me_tracks),
+            (re.compile(r"^/v1/me/albums$"), self.me_albums),
+            (re.compile(r"^/v1/playlists/([^/]+)$"), self.playlist),
+            (re.compile(r"^/v1/playlists/([^/]+)/tracks$"), self.playlist_tracks),
+            (re.compile(r"^/v1/audio-features$"), self.audio_features),
+            (re.compile(r"^/v1/search$"), self.search),
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "connections": self.connections,
+            }
+
+    def connection(self) -> None:
+        """
+        Registra una conexión TCP aceptada.
+        """
+        with self._lock:
+            self.connections += 1
+
+    def handle(self, path: str, query: Dict[str, str]) -> Tuple[int, Dict, bytes]:
+        """
+        Resuelve una solicitud GET y devuelve (código de estado, cabeceras, cuerpo).
+        """
+        with self._lock:
+            self.requests += 1
+            throttle = self._rng.random() < self.error_rate
+            self.throttled += int(throttle)
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        if throttle:
+            return 429, {"Retry-After": str(self.retry_after)}, b""
+
+        for pattern, route in self.routes:
+            match = pattern.match(path)
+            if match:
+                body = route(query, *match.groups())
+                if body is None:
+                    break
+                return 200, {}, body
+
+        return 404, {}, json.dumps({"error": {"status": 404}}).encode()
+
+    def _page(self, path: str, query: Dict[str, str], total: int, items) -> Dict:
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 20))
+        end = min(offset + limit, total)
+
+        return {
+            "href": f"https://api.spotify.com{path}?offset={offset}&limit={limit}",
+            "items": [items(index) for index in range(offset, end)],
+            "limit": limit,
+            "offset": offset,
+            "total": total,
+            "next": (
+                f"https://api.spotify.com{path}?offset={end}&limit={limit}"
+                if end < total
+                else None
+            ),
+            "previous": None,
+        }
+
+    def _playlist_object(self, index: int) -> Dict:
+        return {
+            "id": playlist_id(index),
+            "name": f"Mock Playlist {index}",
+            "snapshot_id": f"snapshot-{index}-{self.playlist_sizes[index]}",
+            "owner": {"id": USER_ID},
+            "tracks": {"total": self.playlist_sizes[index]},
+        }
+
+    def _playlist_index(self, id_: str) -> Optional[int]:
+        match = re.match(r"^mockplaylist(\d{10})$", id_)
+        if match and int(match.group(1)) < len(self.playlist_sizes):
+            return int(match.group(1))
+
+        return None
+
+    def me(self, query: Dict[str, str]) -> bytes:
+        return json.dumps({"id": USER_ID, "display_name": "Mock User"}).encode()
+
+    def me_playlists(self, query: Dict[str, str]) -> bytes:
+        page = self._page(
+            "/v1/me/playlists",
+            query,
+            len(self.playlist_sizes),
+            self._playlist_object,
+        )
+
+        return json.dumps(page).encode()
+
+    def me_top(self, query: Dict[str, str], type_: str) -> bytes:
+        def item(index: int) -> Dict:
+            track = synthetic_track(index)["track"]
+            return track if type_ == "tracks" else track["artists"][0]
+
+        page = self._page(f"/v1/me/top/{type_}", query, self.top_items, item)
+
+        return json.dumps(page).encode()
+
+    def me_tracks(self, query: Dict[str, str]) -> bytes:
+        # Rango de tracks distinto al de las playlists
+        page = self._page(
+            "/v1/me/tracks",
+            query,
+            self.saved_tracks,
+            lambda index: synthetic_track(SAVED_TRACKS + index),
+        )
+
+        return json.dumps(page).encode()
+
+    def _saved_album(self, index: int) -> Dict:
+        tracks = [
+            synthetic_track(SAVED_ALBUMS + index * ALBUM_TRACKS + position)["track"]
+            for position in range(ALBUM_TRACKS)
+        ]
+        album = {
+            **tracks[0]["album"],
+            "id": f"savedalbum{index:012d}",
+            "name": f"Saved Album {index}",
+            "total_tracks": ALBUM_TRACKS,
+        }
+
+        # Los tracks de un álbum vienen sin `album` ni `popularity`
+        album["tracks"] = {
+            "items": [
+                {
+                    key: value
+                    for key, value in track.items()
+                    if key not in ("album", "popularity")
+                }
+                for track in tracks
+            ],
+            "limit": 50,
+            "offset": 0,
+            "total": ALBUM_TRACKS,
+            "next": None,
+        }
+
+        return {"added_at": "2023-05-01T12:00:00Z", "album": album}
+
+    def me_albums(self, query: Dict[str, str]) -> bytes:
+        page = self._page("/v1/me/albums", query, self.saved_albums, self._saved_album)
+
+        return json.dumps(page).encode()
+
+    def playlist(self, query: Dict[str, str], id_: str) -> Optional[bytes]:
+        index = self._playlist_index(id_)
+        if index is None:
+            return None
+
+        return json.dumps(self._playlist_object(index)).encode()
+
+    def playlist_tracks(self, query: Dict[str, str], id_: str) -> Optional[bytes]:
+        index = self._playlist_index(id_)
+        if index is None:
+            return None
+
+        return self._tracks_page(
+            index, int(query.get("offset", 0)), int(query.get("limit", 100))
+        )
+
+    @functools.lru_cache(maxsize=4096)
+    def _tracks_page(self, index: int, offset: int, limit: int) -> bytes:
+        # Cada playlist usa su propio rango de tracks
+        page = self._page(
+            f"/v1/playlists/{playlist_id(index)}/tracks",
+            {"offset": offset, "limit": limit},
+            self.playlist_sizes[index],
+            lambda position: synthetic_track(index * 1_000_000 + position),
+        )
+
+        return json.dumps(page).encode()
+
+    def audio_features(self, query: Dict[str, str]) -> bytes:
+        ids = [id_ for id_ in query.get("ids", "").split(",") if id_]
+
+        return json.dumps(
+            {"audio_features": [synthetic_audio_feature(id_) for id_ in ids]}
+        ).encode()
+
+    def search(self, query: Dict[str, str]) -> bytes:
+        # Un resultado determinista por consulta
+        index = zlib.crc32(query.get("q", "").encode()) % 1_000_000
+        track = synthetic_track(index)["track"]
+
+        return json.dumps(
+            {"tracks": {"items": [track], "total": 1, "limit": 20, "offset": 0}}
+        ).encode()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 para que el cliente reutilice las conexiones (keep-alive)
+    protocol_version = "HTTP/1.1"
+    api: MockSpotifyAPI
+
+    def setup(self):
+        # Una instancia del handler por conexión, no por solicitud
+        super().setup()
+        self.api.connection()
+
+        # Cabeceras y cuerpo van en escrituras separadas; sin TCP_NODELAY, Nagle y
+        # el ACK retrasado del cliente agregan ~40 ms por respuesta con keep-alive
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            status, headers, body = 401, {}, b'{"error": {"status": 401}}'
+        else:
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            status, headers, body = self.api.handle(url.path, query)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockSpotifyServer:
+    """
+    Servidor HTTP del mock en un hilo en segundo plano.
+
+    Ejemplo:
+        with MockSpotifyServer(MockSpotifyAPI([2000] * 5)) as server:
+            spotify = SpotifyAPI(base_url=server.base_url)
+
+    Parameters:
+        api (MockSpotifyAPI): Datos y configuración del mock.
+        host (str): Dirección en la que escucha.
+        port (int): Puerto; 0 elige uno libre.
+    """
+
+    def __init__(self, api: MockSpotifyAPI, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (MockHandler,), {"api": api})
+        self.api = api
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockSpotifyServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_sizes(args: argparse.Namespace) -> List[int]:
+    if args.sizes:
+        return [int(size) for size in args.sizes.split(",")]
+
+    return [args.tracks] * args.playlists
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Agrega las opciones del mock a un parser de argumentos.
+    """
+    parser.add_argument("--playlists", type=int, default=5)
+    parser.add_argument("--tracks", type=int, default=2000,
+                        help="Tracks por playlist")  # fmt: skip
+    parser.add_argument("--sizes", default=None,
+                        help="Tracks de cada playlist separados por coma (reemplaza --playlists/--tracks)")  # fmt: skip
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Probabilidad de responder 429")  # fmt: skip
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--saved-tracks", type=int, default=0,
+                        help="Canciones guardadas en /me/tracks")  # fmt: skip
+    parser.add_argument("--saved-albums", type=int, default=0,
+                        help="Álbumes guardados en /me/albums")  # fmt: skip
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def mock_api(args: argparse.Namespace) -> MockSpotifyAPI:
+    """
+    Crea un `MockSpotifyAPI` a partir de las opciones de `add_mock_arguments`.
+    """
+    return MockSpotifyAPI(
+        playlist_sizes=parse_sizes(args),
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        saved_tracks=args.saved_tracks,
+        saved_albums=args.saved_albums,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockSpotifyServer(mock_api(args), host=args.host, port=args.port)
+    print(f"Mock de la API de Spotify en {server.base_url}")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print("Solicitudes:", server.api.stats())
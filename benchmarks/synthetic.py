@@ -0,0 +1,125 @@
+import random
+from typing import Dict, List, Optional
+
+
+def synthetic_track(index: int, n_albums: int = 2000, n_artists: int = 800) -> Dict:
+    """
+    Construye un item de playlist con la misma forma que devuelve
+    `/v1/playlists/{id}/tracks`.
+
+    Parameters:
+        index (int): Índice de la canción, usado para generar sus IDs.
+        n_albums (int): Cantidad de álbumes distintos.
+        n_artists (int): Cantidad de artistas distintos.
+
+    Returns:
+        Dict: Item de la playlist.
+    """
+    album_index = index % n_albums
+    artists = [
+        {
+            "id": f"artist{(album_index + offset) % n_artists:022d}",
+            "name": f"Artist {(album_index + offset) % n_artists}",
+            "type": "artist",
+            "external_urls": {"spotify": "https://open.spotify.com/artist/x"},
+        }
+        for offset in range(1 + index % 3)
+    ]
+
+    return {
+        "added_at": "2023-05-01T12:00:00Z",
+        "track": {
+            "id": f"track{index:022d}",
+            "name": f"Song {index}",
+            "duration_ms": 180000 + index % 60000,
+            "popularity": index % 100,
+            "explicit": index % 7 == 0,
+            "external_urls": {"spotify": "https://open.spotify.com/track/x"},
+            "artists": artists,
+            "album": {
+                "id": f"album{album_index:022d}",
+                "name": f"Album {album_index}",
+                "release_date": "2020-01-01",
+                "total_tracks": 12,
+                "external_urls": {"spotify": "https://open.spotify.com/album/x"},
+                "artists": artists[:1],
+            },
+        },
+    }
+
+
+def synthetic_playlist(n_tracks: int, seed: Optional[int] = 0) -> List[Dict]:
+    """
+    Construye una playlist sintética de `n_tracks` items (con algunos tracks nulos,
+    como los episodios o canciones eliminadas que devuelve la API).
+    """
+    rng = random.Random(seed)
+
+    return [
+        (
+            {"added_at": None, "track": None}
+            if rng.random() < 0.001
+            else synthetic_track(index)
+        )
+        for index in range(n_tracks)
+    ]
+
+
+def synthetic_audio_feature(track_id: str) -> Dict:
+    """
+    Construye unas características de audio con la forma de `/v1/audio-features`.
+    """
+    rng = random.Random(track_id)
+
+    return {
+        "id": track_id,
+        "danceability": rng.random(),
+        "energy": rng.random(),
+        "key": rng.randrange(12),
+        "loudness": -rng.random() * 20,
+        "mode": rng.randrange(2),
+        "speechiness": rng.random(),
+        "acousticness": rng.random(),
+        "instrumentalness": rng.random(),
+        "liveness": rng.random(),
+        "valence": rng.random(),
+        "tempo": 60 + rng.random() * 120,
+        "duration_ms": 180000,
+        "time_signature": 4,
+    }
+
+
+def synthetic_chart_html(n_entries: int = 100, filler: int = 30) -> str:
+    """
+    Construye una página HTML con la estructura del chart Hot 100 de Billboard:
+    los atributos `class` repartidos en varias líneas y `filler` elementos de
+    relleno por entrada, como en la página real.
+    """
+    # Import local: `billboard` carga lxml, bs4 y pandas, que el mock no necesita
+    from classes.billboard import ARTIST_CLASS, SONG_CLASS, TOP_ONE_CLASS
+
+    def classes(names: str) -> str:
+        return "\n\t\t".join(names.split())
+
+    def padding(index: int) -> str:
+        return "".join(
+            f'<div class="o-chart-results-list__item lrv-u-flex-grow-1">'
+            f'<a href="/artist/{index}-{item}">Link {item}</a></div>'
+            for item in range(filler)
+        )
+
+    entries = []
+    for index in range(1, n_entries + 1):
+        title_class = TOP_ONE_CLASS if index == 1 else SONG_CLASS
+        entries.append(
+            f'<ul class="o-chart-results-list-row"><li>{padding(index)}'
+            f'<h3 id="title-of-a-story" class="{classes(title_class)}">'
+            f"\n\t\tSong {index}\n\t</h3>"
+            f'<span class="{classes(ARTIST_CLASS)}">\n\t\tArtist {index}\n</span>'
+            f"</li></ul>"
+        )
+
+    return (
+        "<!DOCTYPE html><html><head><title>Billboard Hot 100</title></head>"
+        f"<body><div class=\"chart-results-list\">{''.join(entries)}</div></body></html>"
+    )
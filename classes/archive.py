@@ -0,0 +1,143 @@
+import gzip
+import io
+import json
+import queue
+import threading
+from typing import IO, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Extensión del archivo según la compresión
+EXTENSIONS = {"gzip": "ndjson.gz", "zstd": "ndjson.zst"}
+
+
+def open_archive(path: str, mode: str = "r") -> IO[str]:
+    """
+    Abre un archivo NDJSON comprimido en modo texto. La compresión se deduce de la
+    extensión (`.gz` o `.zst`).
+
+    Parameters:
+        path (str): Ruta del archivo.
+        mode (str): `r` para leer, `w` para escribir.
+
+    Returns:
+        IO[str]: Archivo de texto.
+    """
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(
+                "Se necesita el paquete `zstandard` para los archivos .zst"
+            )
+
+        if mode == "w":
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+
+        return io.TextIOWrapper(stream, encoding="utf-8")
+
+    return gzip.open(path, f"{mode}t", encoding="utf-8")
+
+
+class RawArchiveWriter:
+    """
+    Guarda las páginas en bruto de una playlist como NDJSON compacto en un único
+    archivo comprimido. La escritura se hace en un hilo en segundo plano para no
+    bloquear las solicitudes a la API.
+
+    Parameters:
+        path (str): Ruta del archivo (`.ndjson.gz` o `.ndjson.zst`).
+        max_pending (int): Cantidad máxima de páginas en espera de ser escritas.
+    """
+
+    def __init__(self, path: str, max_pending: int = 64):
+        # Fallar antes de pedir las páginas y no al cerrar el archivo
+        if path.endswith(".zst") and zstandard is None:
+            raise ImportError(
+                "Se necesita el paquete `zstandard` para los archivos .zst"
+            )
+
+        self.path = path
+        self.pages = 0
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            with open_archive(self.path, "w") as fp:
+                while True:
+                    page = self._queue.get()
+                    if page is None:
+                        break
+
+                    fp.write(json.dumps(page, separators=(",", ":")))
+                    fp.write("\n")
+
+        except BaseException as e:
+            self._error = e
+
+            # Vaciar la cola para no bloquear a quien sigue escribiendo
+            while self._queue.get() is not None:
+                pass
+
+    def write(self, page: Dict) -> None:
+        """
+        Encola una página para ser escrita.
+        """
+        self._queue.put(page)
+        self.pages += 1
+
+    def close(self) -> None:
+        """
+        Espera a que se escriban todas las páginas y cierra el archivo.
+
+        Raises:
+            Exception: El error producido en el hilo de escritura, si lo hubo.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """
+    Itera sobre las páginas guardadas en un archivo NDJSON comprimido.
+
+    Parameters:
+        path (str): Ruta del archivo.
+
+    Yields:
+        Dict: La respuesta JSON de cada página, en el orden en que se guardó.
+    """
+    with open_archive(path, "r") as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay_archive(path: str) -> List[Dict]:
+    """
+    Reconstruye la lista de tracks de una playlist a partir de su archivo en bruto,
+    sin consultar la API. El resultado se puede pasar directamente a `model_data`.
+
+    Parameters:
+        path (str): Ruta del archivo.
+
+    Returns:
+        List[Dict]: Lista con todos los tracks de la playlist.
+    """
+    return [item for page in read_archive(path) for item in page["items"]]
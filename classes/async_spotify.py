@@ -0,0 +1,297 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import aiohttp
+
+from classes import utils
+from classes.archive import RawArchiveWriter
+from classes.scheduler import SpotifyRequestError
+from classes.spotify import SpotifyAPI
+
+
+class AsyncSpotifyAPI:
+    """
+    Cliente asíncrono que extrae varias playlists de forma concurrente.
+
+    Reutiliza la autenticación y el modelado de datos de `SpotifyAPI`; solo la
+    descarga de las páginas de tracks se realiza con `aiohttp`.
+
+    Parameters:
+        spotify (SpotifyAPI): Instancia autenticada de `SpotifyAPI`.
+        concurrency (int): Cantidad máxima de playlists procesadas a la vez.
+        max_connections (int): Cantidad máxima de solicitudes HTTP en vuelo.
+    """
+
+    def __init__(
+        self,
+        spotify: SpotifyAPI,
+        concurrency: int = 10,
+        max_connections: int = 32,
+    ):
+        self.spotify = spotify
+        self.concurrency = concurrency
+        self.max_connections = max_connections
+
+    async def get_requests(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> Dict:
+        """
+        Realiza una solicitud HTTP GET asíncrona a la URL especificada, usando la
+        caché de `SpotifyAPI` si está configurada.
+
+        Parámetros:
+            session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+            url (str): La URL a la cual se realiza la solicitud.
+            params (Optional[Dict[str, Any]]): Parámetros de consulta opcionales para la solicitud.
+            snapshot_id (Optional[str]): Snapshot de la playlist; si no cambió, se usa la respuesta en caché.
+
+        Retorna:
+            Dict: La respuesta JSON de la solicitud.
+
+        Lanza:
+            SpotifyRequestError: Si el código de estado de la respuesta no es 200 tras los reintentos.
+        """
+        cache = self.spotify.cache
+        metrics = self.spotify.metrics
+        headers = self.spotify.headers
+        cached = cache.get(url, params, snapshot_id) if cache else None
+
+        if cached is not None:
+            if cached.fresh:
+                if metrics:
+                    metrics.record_cache_hit("GET", url)
+                return cached.payload
+
+            # Revalidar la respuesta almacenada con su ETag
+            if cached.etag:
+                headers = {**headers, "If-None-Match": cached.etag}
+
+        attempts = 0
+
+        async def send():
+            nonlocal attempts
+            attempts += 1
+
+            try:
+                async with session.get(url, headers=headers, params=params) as response:
+                    payload = None
+                    if response.status in (200, 201):
+                        payload = await response.read()
+
+                    return response.status, response.headers, payload
+
+            except aiohttp.ClientConnectionError as e:
+                raise ConnectionError(str(e)) from e
+
+        # Se comparte el scheduler (y su token bucket) con el cliente síncrono
+        status, payload = None, None
+        start = time.perf_counter()
+        try:
+            status, response_headers, payload = (
+                await self.spotify.scheduler.execute_async(send)
+            )
+        finally:
+            if metrics:
+                metrics.record(
+                    "GET",
+                    url,
+                    time.perf_counter() - start,
+                    status=status,
+                    size=len(payload or b""),
+                    retries=max(attempts - 1, 0),
+                )
+
+        if status == 304 and cached is not None:
+            if metrics:
+                metrics.record_cache_hit("GET", url)
+            cache.revalidated(cached)
+            return cached.payload
+
+        if status not in (200, 201):
+            raise SpotifyRequestError("Error al recuperar los datos", status)
+
+        if cache:
+            cache.put(
+                url,
+                params,
+                payload,
+                etag=response_headers.get("ETag"),
+                snapshot_id=snapshot_id,
+            )
+
+        return json.loads(payload)
+
+    async def playlist_tracks(
+        self,
+        session: aiohttp.ClientSession,
+        playlist_id: str,
+        raw_path: str,
+        snapshot_id: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Recupera todos los tracks de una playlist. Se descarga la primera página,
+        se lee `total` y el resto de páginas se solicitan en paralelo.
+
+        Parameters:
+            session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+            playlist_id (str): ID de la playlist de Spotify.
+            raw_path (str): Directorio donde se guarda la data en bruto.
+            snapshot_id (Optional[str]): Snapshot de la playlist, usado para revalidar la caché.
+
+        Returns:
+            List[Dict]: Lista con todos los tracks de la playlist, en orden.
+        """
+        url = f"{self.spotify.base_url}/playlists/{playlist_id}/tracks"
+        limit = 100
+
+        # Primera página para conocer el total de tracks
+        first_page = await self.get_requests(
+            session, url, params={"offset": 0, "limit": limit}, snapshot_id=snapshot_id
+        )
+
+        # Resto de páginas solicitadas en paralelo
+        offsets = range(limit, first_page["total"], limit)
+        pages = await asyncio.gather(
+            *[
+                self.get_requests(
+                    session,
+                    url,
+                    params={"offset": offset, "limit": limit},
+                    snapshot_id=snapshot_id,
+                )
+                for offset in offsets
+            ]
+        )
+
+        pages = [first_page, *pages]
+        playlist_data = [item for response in pages for item in response["items"]]
+
+        # Guardar la data en bruto en un archivo NDJSON comprimido o en formato JSON
+        if self.spotify.raw_archive:
+            with RawArchiveWriter(self.spotify.raw_archive_path(raw_path)) as archive:
+                for response in pages:
+                    archive.write(response)
+        else:
+            for offset, response in zip([0, *offsets], pages):
+                utils.save_raw_json(
+                    json_path=f"{raw_path}/data_{offset + limit}.json",
+                    json_dict=response,
+                )
+
+        return playlist_data
+
+    async def playlist_data(
+        self, session: aiohttp.ClientSession, playlist_id: str
+    ) -> Optional[List[Dict]]:
+        """
+        Extrae una playlist y guarda la data en bruto y en parquet, igual que
+        `SpotifyAPI.playlist_data` (incluida la sincronización incremental). Con un
+        `RunManifest` se omiten las playlists ya completadas; las páginas se piden
+        en paralelo y se guardan al final, por lo que no se reanudan por página.
+
+        Parameters:
+            session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+            playlist_id (str): ID de la playlist de Spotify.
+
+        Returns:
+            Optional[List[Dict]]: Lista con todos los tracks de la playlist, o None si no cambió.
+        """
+        playlist_info = await self.get_requests(
+            session, f"{self.spotify.base_url}/playlists/{playlist_id}"
+        )
+        snapshot_id = playlist_info.get("snapshot_id")
+
+        # Omitir las playlists completadas antes de que se interrumpiera la ejecución
+        manifest = self.spotify.manifest
+        if manifest and manifest.completed(playlist_id, snapshot_id):
+            return None
+
+        # Omitir las playlists que no cambiaron desde la última sincronización
+        snapshots = self.spotify.snapshots
+        previous_path = None
+        if snapshots:
+            if snapshots.unchanged(playlist_id, snapshot_id):
+                return None
+
+            previous = snapshots.get(playlist_id)
+            previous_path = previous["parquet_path"] if previous else None
+        raw_data_path, parquet_data_path = self.spotify.playlist_paths(
+            playlist_info["name"]
+        )
+
+        if manifest:
+            manifest.start(playlist_id, snapshot_id, raw_data_path, parquet_data_path)
+
+        with self.spotify.profile_stage("fetch_pages", playlist_id):
+            playlist_data = await self.playlist_tracks(
+                session,
+                playlist_id=playlist_id,
+                raw_path=raw_data_path,
+                snapshot_id=snapshot_id,
+            )
+
+        # El modelado (pandas + parquet) se ejecuta fuera del event loop
+        await asyncio.to_thread(
+            self.spotify.model_data,
+            playlist_data=playlist_data,
+            parquet_path=parquet_data_path,
+            previous_path=previous_path,
+            playlist_id=playlist_id,
+        )
+
+        if snapshots:
+            snapshots.update(playlist_id, snapshot_id, parquet_data_path)
+
+        if manifest:
+            manifest.complete(playlist_id)
+
+        return playlist_data
+
+    async def extract_playlists(
+        self, playlist_ids: List[str], progress: Optional[Any] = None
+    ) -> Dict[str, Union[List[Dict], Exception]]:
+        """
+        Extrae varias playlists de forma concurrente con un límite de concurrencia.
+
+        Parameters:
+            playlist_ids (List[str]): IDs de las playlists a extraer.
+            progress (Optional[Any]): Barra de progreso (por ejemplo `tqdm`) a actualizar.
+
+        Returns:
+            Dict[str, Union[List[Dict], Exception]]: Tracks de cada playlist, o la
+            excepción producida si su extracción falló.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+
+            async def extract(playlist_id: str):
+                async with semaphore:
+                    try:
+                        return await self.playlist_data(session, playlist_id)
+                    except Exception as e:
+                        return e
+                    finally:
+                        if progress is not None:
+                            progress.update(1)
+
+            results = await asyncio.gather(
+                *[extract(playlist_id) for playlist_id in playlist_ids]
+            )
+
+        return dict(zip(playlist_ids, results))
+
+    def run(
+        self, playlist_ids: List[str], progress: Optional[Any] = None
+    ) -> Dict[str, Union[List[Dict], Exception]]:
+        """
+        Punto de entrada síncrono para `extract_playlists`.
+        """
+        return asyncio.run(self.extract_playlists(playlist_ids, progress=progress))
@@ -0,0 +1,243 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Literal, Optional
+
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextlib.contextmanager
+def locked(path: str) -> Iterator[None]:
+    """
+    Bloqueo exclusivo entre procesos sobre `<path>.lock`. En sistemas sin `fcntl`
+    (Windows) no se bloquea.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class TokenManager:
+    """
+    Mantiene vigente el token de acceso a la API de Spotify.
+
+    El token se renueva en un hilo en segundo plano `refresh_margin` segundos
+    antes de que expire, de modo que las solicitudes en curso siguen usando el
+    token anterior (todavía válido) sin esperar. El token y el refresh token se
+    guardan en `cache_path`, protegido con un bloqueo de archivo, para que varios
+    procesos compartan la misma autorización: solo el primero hace el flujo
+    interactivo y cada renovación la hace un único proceso.
+
+    Con `mode="client_credentials"` no hay interacción ni refresh token; sirve
+    para los endpoints que no son del usuario (playlists, canciones,
+    características de audio), pero no para `/me`.
+
+    Parameters:
+        client_id (str): Client ID de la aplicación.
+        client_secret (str): Client secret de la aplicación.
+        mode (str): `user` (authorization code) o `client_credentials`.
+        username (Optional[str]): Usuario de Spotify, en modo `user`.
+        redirect_uri (Optional[str]): URI de redirección, en modo `user`.
+        scope (Optional[str]): Permisos solicitados, en modo `user`.
+        cache_path (Optional[str]): Archivo del token compartido. Default: `.cache/spotify-<mode>.json`.
+        refresh_margin (float): Segundos antes de la expiración en que se renueva el token.
+        background (bool): Si es True, la renovación se hace en un hilo en segundo plano.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        mode: Literal["user", "client_credentials"] = "user",
+        username: Optional[str] = None,
+        redirect_uri: Optional[str] = None,
+        scope: Optional[str] = None,
+        cache_path: Optional[str] = None,
+        refresh_margin: float = 300.0,
+        background: bool = True,
+    ):
+        self.mode = mode
+        self.cache_path = cache_path or os.path.join(".cache", f"spotify-{mode}.json")
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+
+        Path(self.cache_path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Los tokens se guardan en `cache_path` con bloqueo, no en la caché de spotipy
+        if mode == "user":
+            self._auth = SpotifyOAuth(
+                client_id=client_id,
+                client_secret=client_secret,
+                redirect_uri=redirect_uri,
+                scope=scope,
+                username=username,
+                cache_handler=MemoryCacheHandler(),
+            )
+        elif mode == "client_credentials":
+            self._auth = SpotifyClientCredentials(
+                client_id=client_id,
+                client_secret=client_secret,
+                cache_handler=MemoryCacheHandler(),
+            )
+        else:
+            raise ValueError("mode debe ser 'user' o 'client_credentials'")
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._token_info = self._load_or_authorize()
+
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _read_cache(self) -> Optional[Dict]:
+        try:
+            with open(self.cache_path) as fp:
+                return json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_cache(self, token_info: Dict) -> None:
+        # El archivo guarda el refresh token: solo lo puede leer el usuario (0600)
+        temp_path = f"{self.cache_path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.chmod(temp_path, 0o600)
+        with os.fdopen(fd, "w") as fp:
+            json.dump(token_info, fp)
+        os.replace(temp_path, self.cache_path)
+
+    def _expiring(self, token_info: Optional[Dict]) -> bool:
+        return (
+            token_info is None
+            or token_info.get("expires_at", 0) - self.refresh_margin <= time.time()
+        )
+
+    def _load_or_authorize(self) -> Dict:
+        with locked(self.cache_path):
+            token_info = self._read_cache()
+
+            if token_info is not None and not self._expiring(token_info):
+                return token_info
+
+            return self._renew(token_info)
+
+    def _renew(self, token_info: Optional[Dict]) -> Dict:
+        # Se llama con el bloqueo de archivo tomado
+        if self.mode == "client_credentials":
+            token_info = self._auth.get_access_token(as_dict=True, check_cache=False)
+        elif token_info and token_info.get("refresh_token"):
+            token_info = self._auth.refresh_access_token(token_info["refresh_token"])
+        else:
+            # Flujo interactivo, solo la primera vez
+            code = self._auth.get_auth_response()
+            token_info = self._auth.get_access_token(
+                code=code, as_dict=True, check_cache=False
+            )
+
+        self._write_cache(token_info)
+        self.refreshes += 1
+
+        return token_info
+
+    def refresh(self) -> None:
+        """
+        Renueva el token si está por expirar. Si otro proceso ya lo renovó, se usa
+        el que está en `cache_path`.
+        """
+        with self._lock:
+            if not self._expiring(self._token_info):
+                return
+
+            with locked(self.cache_path):
+                token_info = self._read_cache()
+
+                if self._expiring(token_info):
+                    token_info = self._renew(token_info or self._token_info)
+
+                self._token_info = token_info
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            wait = self._token_info["expires_at"] - self.refresh_margin - time.time()
+
+            if self._stop.wait(max(wait, 0)):
+                break
+
+            try:
+                self.refresh()
+            except Exception:
+                # Reintentar más tarde; `access_token` renueva si hace falta
+                self._stop.wait(30)
+
+    @property
+    def access_token(self) -> str:
+        """
+        Token de acceso vigente. Solo bloquea si el token ya expiró (por ejemplo,
+        sin hilo en segundo plano).
+        """
+        if self._token_info["expires_at"] <= time.time():
+            self.refresh()
+
+        return self._token_info["access_token"]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        Cabeceras de autorización con el token vigente.
+        """
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
+
+    def close(self) -> None:
+        """
+        Detiene el hilo de renovación.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class StaticToken:
+    """
+    Token de acceso fijo, sin renovación. `SpotifyAPI` lo usa cuando está definida la
+    variable de entorno `SPOTIFY_ACCESS_TOKEN`, por ejemplo contra el servidor local
+    de `benchmarks/mock_server.py`.
+
+    Parameters:
+        access_token (str): Token de acceso.
+    """
+
+    def __init__(self, access_token: str):
+        self.access_token = access_token
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        Cabeceras de autorización con el token.
+        """
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
+
+    def close(self) -> None:
+        pass
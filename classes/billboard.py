@@ -1,75 +1,216 @@
+import os
 import re
+import uuid
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
 
+import lxml.html
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 
 from classes import utils
+from classes.session import get_session
 
 warnings.filterwarnings("ignore")
 
+# Clases CSS de la canción en el primer lugar, del resto de canciones y de los artistas
+TOP_ONE_CLASS = "c-title a-no-trucate a-font-primary-bold-s u-letter-spacing-0021 u-font-size-23@tablet lrv-u-font-size-16 u-line-height-125 u-line-height-normal@mobile-max a-truncate-ellipsis u-max-width-245 u-max-width-230@tablet-only u-letter-spacing-0028@tablet"
+SONG_CLASS = "c-title a-no-trucate a-font-primary-bold-s u-letter-spacing-0021 lrv-u-font-size-18@tablet lrv-u-font-size-16 u-line-height-125 u-line-height-normal@mobile-max a-truncate-ellipsis u-max-width-330 u-max-width-230@tablet-only"
+ARTIST_CLASS = "c-label a-no-trucate a-font-primary-s lrv-u-font-size-14@mobile-max u-line-height-normal@mobile-max u-letter-spacing-0021 lrv-u-display-block a-truncate-ellipsis-2line u-max-width-330 u-max-width-230@tablet-only"
 
-def billboard_hot_100(date: bool = False) -> pd.DataFrame:
-    """
-    Devuelve un diccionario con las 100 canciones más populares en Billboard en una fecha específica o en la fecha actual.
+# Selector compilado una sola vez: devuelve, en orden del documento, todos los
+# elementos del chart (primer lugar, canciones y artistas)
+_CHART_XPATH = etree.XPath(
+    f'//h3[normalize-space(@class) = "{TOP_ONE_CLASS}"'
+    f' or contains(normalize-space(@class), "{SONG_CLASS}")]'
+    f' | //span[contains(normalize-space(@class), "{ARTIST_CLASS}")]'
+)
 
-    Args:
-        date (bool, optional): Fecha en formato YYYY-MM-DD. Si es True, se usará la fecha actual. Default: True.
+PARSERS = ["lxml", "html.parser"]
 
-    Returns:
-        dict: Diccionario con las claves como nombres de las canciones y los valores como nombres de los artistas.
 
-    """
+def _parse_lxml(html: str) -> Tuple[Optional[str], List[str], List[str]]:
+    top_one_song, songs, artist = None, [], []
 
-    # Si date es True, se obtiene la fecha actual
-    if date:
-        date = utils.check_date()
-        url = f"https://www.billboard.com/charts/hot-100/{date}"
+    for element in _CHART_XPATH(lxml.html.document_fromstring(html)):
+        text = element.text_content().strip()
 
-    # Si date es False, se usa la url de la fecha actual
-    else:
-        url = f"https://www.billboard.com/charts/hot-100/"
+        if element.tag == "span":
+            artist.append(text)
+        elif " ".join(element.get("class").split()) == TOP_ONE_CLASS:
+            top_one_song = top_one_song or text
+        else:
+            songs.append(text)
+
+    return top_one_song, songs, artist
 
-    # Se hace una solicitud GET a la url especificada
-    response = requests.get(url, verify=False)
 
+def _parse_html_parser(html: str) -> Tuple[Optional[str], List[str], List[str]]:
     # Se crea un objeto BeautifulSoup para procesar el HTML de la página
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
 
     # Se obtiene el nombre de la canción en el primer lugar de la lista
-    top_one_song = (
-        soup.find(
-            "h3",
-            class_="c-title a-no-trucate a-font-primary-bold-s u-letter-spacing-0021 u-font-size-23@tablet lrv-u-font-size-16 u-line-height-125 u-line-height-normal@mobile-max a-truncate-ellipsis u-max-width-245 u-max-width-230@tablet-only u-letter-spacing-0028@tablet",
-        )
-        .get_text()
-        .strip()
-    )
+    top_one_song = soup.find("h3", class_=TOP_ONE_CLASS).get_text().strip()
 
     # Se obtienen todos los nombres de las canciones y artistas en la lista
-    song_tags = soup.find_all(
-        "h3",
-        class_=re.compile(
-            "c-title a-no-trucate a-font-primary-bold-s u-letter-spacing-0021 lrv-u-font-size-18@tablet lrv-u-font-size-16 u-line-height-125 u-line-height-normal@mobile-max a-truncate-ellipsis u-max-width-330 u-max-width-230@tablet-only"
-        ),
-    )
-    artist_tags = soup.find_all(
-        "span",
-        class_=re.compile(
-            "c-label a-no-trucate a-font-primary-s lrv-u-font-size-14@mobile-max u-line-height-normal@mobile-max u-letter-spacing-0021 lrv-u-display-block a-truncate-ellipsis-2line u-max-width-330 u-max-width-230@tablet-only"
-        ),
-    )
+    song_tags = soup.find_all("h3", class_=re.compile(SONG_CLASS))
+    artist_tags = soup.find_all("span", class_=re.compile(ARTIST_CLASS))
 
     # Se guardan los nombres de las canciones y artistas en listas separadas
     songs = [tag.get_text().strip() for tag in song_tags]
     artist = [tag.get_text().strip() for tag in artist_tags]
 
+    return top_one_song, songs, artist
+
+
+def parse_hot_100(html: str, parser: str = "lxml") -> pd.DataFrame:
+    """
+    Extrae las canciones y artistas de la página HTML de un chart Hot 100.
+
+    Args:
+        html (str): HTML de la página del chart.
+        parser (str): `lxml` (selector XPath compilado, un solo recorrido) o `html.parser` (BeautifulSoup). Default: lxml.
+
+    Returns:
+        pd.DataFrame: DataFrame con las columnas `rank`, `song` y `artist`.
+
+    """
+
+    if parser == "lxml":
+        top_one_song, songs, artist = _parse_lxml(html)
+    elif parser == "html.parser":
+        top_one_song, songs, artist = _parse_html_parser(html)
+    else:
+        raise ValueError(f"parser debe ser uno de {PARSERS}")
+
     # Se agrega el nombre de la canción en el primer lugar de la lista
     songs.insert(0, top_one_song)
 
+    rows = list(zip(songs, artist))
+    df = pd.DataFrame(rows, columns=["song", "artist"])
+    df.insert(0, "rank", range(1, len(df) + 1))
+
+    return df
+
+
+def fetch_chart_html(
+    chart_date: Optional[str] = None, cache_dir: Optional[str] = None
+) -> str:
+    """
+    Descarga la página HTML del Hot 100 de una fecha. Si se indica `cache_dir`, la
+    página se guarda en disco y las siguientes llamadas la leen de ahí.
+
+    Args:
+        chart_date (Optional[str]): Fecha en formato YYYY-MM-DD. Si es None, se usa el chart actual.
+        cache_dir (Optional[str]): Directorio de la caché de páginas HTML.
+
+    Returns:
+        str: HTML de la página del chart.
+
+    """
+
+    url = f"https://www.billboard.com/charts/hot-100/{chart_date or ''}"
+
+    cache_path = None
+    if cache_dir and chart_date:
+        cache_path = os.path.join(cache_dir, f"{chart_date}.html")
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as fp:
+                return fp.read()
+
+    # Se hace una solicitud GET a la url especificada
+    response = get_session().get(url, verify=False)
+    response.raise_for_status()
+
+    if cache_path:
+        # Escribir en un archivo temporal y renombrarlo, para que una ejecución
+        # interrumpida no deje en la caché una página incompleta
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        temp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as fp:
+            fp.write(response.text)
+        os.replace(temp_path, cache_path)
+
+    return response.text
+
+
+def billboard_hot_100(date: Union[bool, str] = False) -> pd.DataFrame:
+    """
+    Devuelve un diccionario con las 100 canciones más populares en Billboard en una fecha específica o en la fecha actual.
+
+    Args:
+        date (Union[bool, str], optional): Fecha en formato YYYY-MM-DD. Si es True, se pide la fecha por consola. Si es False, se usa el chart actual. Default: False.
+
+    Returns:
+        dict: Diccionario con las claves como nombres de las canciones y los valores como nombres de los artistas.
+
+    """
+
+    # Si date es True, se pide la fecha por consola
+    if date is True:
+        date = utils.check_date()
+
+    chart = parse_hot_100(fetch_chart_html(date or None))
+
     # Se crea un diccionario con las claves como nombres de las canciones y los valores como nombres de los artistas
-    data = dict(zip(songs, artist))
+    data = dict(zip(chart["song"], chart["artist"]))
     df = pd.DataFrame(data.items(), columns=["song", "artist"])
 
     return df
+
+
+def crawl_hot_100(
+    start: str,
+    end: str,
+    step_days: int = 7,
+    max_workers: int = 8,
+    cache_dir: str = "api_data/billboard_html",
+    parquet_path: Optional[str] = None,
+    parser: str = "lxml",
+) -> pd.DataFrame:
+    """
+    Descarga los charts Hot 100 de un rango de fechas de forma concurrente, sin
+    interacción por consola. Las páginas se guardan en `cache_dir`, por lo que
+    volver a procesar un rango no vuelve a descargarlas.
+
+    Args:
+        start (str): Fecha inicial en formato YYYY-MM-DD.
+        end (str): Fecha final en formato YYYY-MM-DD (incluida).
+        step_days (int): Días entre charts. Default: 7 (semanal).
+        max_workers (int): Cantidad de descargas en paralelo.
+        cache_dir (str): Directorio de la caché de páginas HTML.
+        parquet_path (Optional[str]): Si se indica, el resultado se guarda también en parquet.
+        parser (str): Backend de `parse_hot_100`. Default: lxml.
+
+    Returns:
+        pd.DataFrame: DataFrame en formato largo con las columnas `date`, `rank`, `song` y `artist`.
+
+    """
+
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    chart_dates = [
+        (first + timedelta(days=days)).isoformat()
+        for days in range(0, (last - first).days + 1, step_days)
+    ]
+
+    def crawl(chart_date: str) -> pd.DataFrame:
+        chart = parse_hot_100(
+            fetch_chart_html(chart_date, cache_dir=cache_dir), parser=parser
+        )
+        chart.insert(0, "date", chart_date)
+
+        return chart
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        charts = list(executor.map(crawl, chart_dates))
+
+    df = pd.concat(charts, ignore_index=True)
+
+    if parquet_path:
+        df.to_parquet(parquet_path)
+
+    return df
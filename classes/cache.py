@@ -0,0 +1,225 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import urlencode
+
+# Tiempo de vida (segundos) por familia de endpoints, evaluado en orden
+DEFAULT_TTL = {
+    r"/v1/audio-features": 30 * 24 * 3600,
+    r"/v1/search": 7 * 24 * 3600,
+    r"/v1/playlists/[^/]+/tracks": 24 * 3600,
+    r"/v1/playlists/[^/]+$": 3600,
+    r"/v1/me": 3600,
+}
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    """
+    Respuesta almacenada en la caché.
+    """
+
+    key: str
+    payload: Dict[str, Any]
+    etag: Optional[str]
+    size: int
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    Caché persistente en SQLite de las respuestas GET de la API.
+
+    Las entradas se identifican por URL + parámetros, expiran según el TTL de su
+    familia de endpoints y se revalidan con `If-None-Match` (ETag) o con el
+    `snapshot_id` de la playlist. Cuando se supera `max_bytes` se eliminan las
+    entradas usadas hace más tiempo (LRU).
+
+    Parameters:
+        path (str): Ruta del archivo SQLite.
+        max_bytes (int): Tamaño máximo de las respuestas almacenadas.
+        ttl (Optional[Dict[str, float]]): TTL en segundos por patrón de URL.
+    """
+
+    def __init__(
+        self,
+        path: str = "api_data/cache.sqlite",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[Dict[str, float]] = None,
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.max_bytes = max_bytes
+        self.ttl = [
+            (re.compile(pattern), seconds)
+            for pattern, seconds in (ttl or DEFAULT_TTL).items()
+        ]
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                snapshot_id TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Construye la llave de una solicitud a partir de la URL y sus parámetros.
+        """
+        if not params:
+            return url
+
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def ttl_for(self, url: str) -> float:
+        """
+        Devuelve el TTL en segundos de la familia de endpoints de la URL.
+        """
+        for pattern, seconds in self.ttl:
+            if pattern.search(url.split("?")[0]):
+                return seconds
+
+        return 0
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> Optional[CachedResponse]:
+        """
+        Busca una respuesta en la caché.
+
+        Parameters:
+            url (str): URL de la solicitud.
+            params (Optional[Dict[str, Any]]): Parámetros de la solicitud.
+            snapshot_id (Optional[str]): Snapshot actual de la playlist; si se indica, la
+                entrada es vigente solo si coincide con el snapshot almacenado.
+
+        Returns:
+            Optional[CachedResponse]: La entrada encontrada, o None si no existe.
+        """
+        key = self.key(url, params)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, snapshot_id, stored_at, size FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            body, etag, stored_snapshot_id, stored_at, size = row
+
+            # Con snapshot_id la vigencia depende solo de que la playlist no haya cambiado
+            if snapshot_id is not None:
+                fresh = snapshot_id == stored_snapshot_id
+            else:
+                fresh = time.time() - stored_at < self.ttl_for(url)
+
+            if fresh:
+                self.hits += 1
+                self.bytes_saved += size
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                self._conn.commit()
+            else:
+                self.misses += 1
+
+        return CachedResponse(key, json.loads(body), etag, size, fresh)
+
+    def revalidated(self, entry: CachedResponse) -> None:
+        """
+        Registra que la API confirmó (304) que una entrada sigue vigente.
+        """
+        now = time.time()
+
+        with self._lock:
+            self.revalidations += 1
+            self.bytes_saved += entry.size
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, entry.key),
+            )
+            self._conn.commit()
+
+    def put(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        body: bytes,
+        etag: Optional[str] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> None:
+        """
+        Almacena una respuesta y elimina las entradas menos usadas si se supera el tamaño máximo.
+
+        Parameters:
+            url (str): URL de la solicitud.
+            params (Optional[Dict[str, Any]]): Parámetros de la solicitud.
+            body (bytes): Contenido JSON de la respuesta.
+            etag (Optional[str]): Cabecera `ETag` de la respuesta.
+            snapshot_id (Optional[str]): Snapshot de la playlist a la que pertenece la respuesta.
+        """
+        key = self.key(url, params)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, snapshot_id, now, now, len(body)),
+            )
+
+            # Eliminar las entradas usadas hace más tiempo (LRU)
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ).fetchall()
+
+                evicted = []
+                for old_key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    total -= size
+
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve los contadores de la caché.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "bytes_saved": self.bytes_saved,
+            }
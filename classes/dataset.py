@@ -0,0 +1,191 @@
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Tablas que genera `SpotifyAPI.model_data`
+TABLES = ["albums", "artists", "songs", "songs_features", "merge_data"]
+
+
+class PartitionedDataset:
+    """
+    Dataset parquet consolidado de todas las playlists y fechas, particionado al
+    estilo Hive por fecha de ejecución y playlist:
+
+        <root>/<tabla>/run_date=YYYY-MM-DD/playlist_id=<id>/part-<uuid>.parquet
+
+    Las columnas de texto se guardan con codificación de diccionario y los archivos
+    pequeños de cada partición se pueden compactar en uno solo con `compact`.
+
+    Parameters:
+        root (str): Directorio raíz del dataset.
+        compression (str): Códec de compresión de parquet (zstd, snappy, gzip, ...).
+    """
+
+    def __init__(self, root: str = "api_data/dataset", compression: str = "zstd"):
+        self.root = root
+        self.compression = compression
+        self.partitioning = ds.partitioning(
+            pa.schema([("run_date", pa.string()), ("playlist_id", pa.string())]),
+            flavor="hive",
+        )
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        # Codificar con diccionario las columnas de texto
+        for index, field in enumerate(table.schema):
+            if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                table = table.set_column(
+                    index, field.name, table.column(index).dictionary_encode()
+                )
+
+        return table
+
+    def partition_path(self, name: str, run_date: str, playlist_id: str) -> str:
+        """
+        Directorio de la partición de una playlist en la tabla `name`.
+        """
+        return os.path.join(
+            self.root, name, f"run_date={run_date}", f"playlist_id={playlist_id}"
+        )
+
+    def clear(self, run_date: str, playlist_id: str) -> None:
+        """
+        Elimina la partición de una playlist en todas las tablas, para volver a
+        escribirla sin duplicar filas.
+        """
+        for name in TABLES:
+            shutil.rmtree(
+                self.partition_path(name, run_date, playlist_id), ignore_errors=True
+            )
+
+    def write(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        run_date: str,
+        playlist_id: str,
+        replace: bool = False,
+    ) -> None:
+        """
+        Agrega las tablas de una playlist a su partición.
+
+        Parameters:
+            frames (Dict[str, pd.DataFrame]): Tablas a escribir por nombre.
+            run_date (str): Fecha de ejecución (YYYY-MM-DD).
+            playlist_id (str): ID de la playlist de Spotify.
+            replace (bool): Si es True, se elimina antes la partición de la playlist
+                (ver `clear`); si es False, las filas se agregan a las existentes.
+        """
+        if replace:
+            self.clear(run_date, playlist_id)
+
+        for name, df in frames.items():
+            if df.empty:
+                continue
+
+            table = self._to_table(df)
+            table = table.append_column(
+                "run_date", pa.array([run_date] * len(table), pa.string())
+            ).append_column(
+                "playlist_id", pa.array([playlist_id] * len(table), pa.string())
+            )
+
+            ds.write_dataset(
+                table,
+                base_dir=os.path.join(self.root, name),
+                format="parquet",
+                partitioning=self.partitioning,
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                file_options=ds.ParquetFileFormat().make_write_options(
+                    compression=self.compression
+                ),
+            )
+
+    def read(self, name: str) -> ds.Dataset:
+        """
+        Abre una tabla del dataset para consultarla con filtros sobre las particiones.
+
+        Ejemplo:
+            dataset.read("songs").to_table(filter=ds.field("run_date") == "2023-05-01")
+        """
+        return ds.dataset(
+            os.path.join(self.root, name), format="parquet", partitioning="hive"
+        )
+
+    def compact(self) -> Dict:
+        """
+        Une los archivos de cada partición en un único archivo.
+
+        Los archivos de una partición pueden tener esquemas distintos (por ejemplo,
+        una columna nula en una ventana y de texto en otra), así que se unifican los
+        esquemas antes de unirlos. Si una partición no se puede compactar se deja
+        como está y se continúa con las demás.
+
+        Returns:
+            Dict: Cantidad de archivos eliminados (`removed`) y error de cada
+                partición que no se pudo compactar (`errors`).
+        """
+        removed = 0
+        errors = {}
+
+        for name in TABLES:
+            for partition in self._partitions(os.path.join(self.root, name)):
+                files = sorted(Path(partition).glob("*.parquet"))
+                if len(files) < 2:
+                    continue
+
+                # Escribir primero el archivo compactado y luego borrar los originales
+                temp_path = os.path.join(partition, f".compact-{uuid.uuid4().hex}")
+                try:
+                    table = self._concat([pq.read_table(file) for file in files])
+                    pq.write_table(table, temp_path, compression=self.compression)
+                except Exception as e:
+                    errors[partition] = str(e)
+                    Path(temp_path).unlink(missing_ok=True)
+                    continue
+
+                for file in files:
+                    file.unlink()
+                os.replace(
+                    temp_path,
+                    os.path.join(partition, f"part-{uuid.uuid4().hex}-0.parquet"),
+                )
+
+                removed += len(files) - 1
+
+        return {"removed": removed, "errors": errors}
+
+    @staticmethod
+    def _concat(tables: List[pa.Table]) -> pa.Table:
+        schema = pa.unify_schemas([table.schema for table in tables])
+
+        # Llevar cada tabla al esquema unificado; las columnas que falten quedan nulas
+        aligned = []
+        for table in tables:
+            columns = [
+                (
+                    table.column(field.name).cast(field.type)
+                    if field.name in table.column_names
+                    else pa.nulls(len(table), field.type)
+                )
+                for field in schema
+            ]
+            aligned.append(pa.Table.from_arrays(columns, schema=schema))
+
+        return pa.concat_tables(aligned)
+
+    @staticmethod
+    def _partitions(table_root: str) -> List[str]:
+        return [
+            str(path)
+            for path in Path(table_root).glob("run_date=*/playlist_id=*")
+            if path.is_dir()
+        ]
@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Máximo de variables por consulta en SQLite
+SQLITE_BATCH = 500
+
+
+class FeatureStore:
+    """
+    Almacén persistente en SQLite de las características de audio por ID de canción.
+
+    Las características de audio no cambian, así que una vez descargadas se
+    reutilizan en todas las playlists de la ejecución y en las ejecuciones
+    siguientes. Las consultas se sirven primero desde memoria.
+
+    Parameters:
+        path (str): Ruta del archivo SQLite.
+    """
+
+    def __init__(self, path: str = "api_data/audio_features.sqlite"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._memory: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS features (track_id TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, track_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Devuelve las características almacenadas de los IDs indicados.
+
+        Parameters:
+            track_ids (Iterable[str]): IDs de las canciones.
+
+        Returns:
+            Dict[str, Dict]: Características por ID; los IDs desconocidos no se incluyen.
+        """
+        track_ids = list(track_ids)
+
+        with self._lock:
+            found = {
+                track_id: self._memory[track_id]
+                for track_id in track_ids
+                if track_id in self._memory
+            }
+            missing = list(set(track_ids) - found.keys())
+
+            for i in range(0, len(missing), SQLITE_BATCH):
+                batch = missing[i : i + SQLITE_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT track_id, payload FROM features WHERE track_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+
+                for track_id, payload in rows:
+                    found[track_id] = self._memory[track_id] = json.loads(payload)
+
+        return found
+
+    def put_many(self, features: List[Dict]) -> None:
+        """
+        Guarda las características de audio devueltas por la API.
+
+        Parameters:
+            features (List[Dict]): Características de audio (cada una con su `id`).
+        """
+        with self._lock:
+            for feature in features:
+                self._memory[feature["id"]] = feature
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO features VALUES (?, ?)",
+                [(feature["id"], json.dumps(feature)) for feature in features],
+            )
+            self._conn.commit()
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class RunManifest:
+    """
+    Registra el avance de una ejecución de `main.py` para poder reanudarla si se
+    interrumpe: qué playlists se completaron y, en las que quedaron a medias, el
+    offset de la última página guardada en bruto.
+
+    El manifiesto solo se reutiliza si la ejecución anterior no terminó; al crear
+    uno sobre una ejecución terminada se empieza de cero. El archivo se escribe de
+    forma atómica al empezar y al completar cada playlist; el offset de las páginas
+    guardadas se escribe a lo sumo cada `checkpoint_interval` segundos, por lo que
+    al reanudar se pueden volver a pedir las últimas páginas.
+
+    Parameters:
+        path (str): Ruta del archivo JSON del manifiesto, por ejemplo
+            `api_data/<fecha>/manifest.json`.
+        checkpoint_interval (float): Segundos mínimos entre escrituras del archivo
+            por `checkpoint`.
+    """
+
+    def __init__(self, path: str, checkpoint_interval: float = 5.0):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._saved_at = float("-inf")
+
+        try:
+            with open(path) as fp:
+                self.state = json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.state = {}
+
+        self.resumed = bool(self.state) and not self.state.get("finished", False)
+        if not self.resumed:
+            self.state = {"finished": False, "playlists": {}}
+
+    def _save(self) -> None:
+        # Se llama con el bloqueo tomado
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as fp:
+            json.dump(self.state, fp, indent=4)
+
+        os.replace(temp_path, self.path)
+        self._saved_at = time.monotonic()
+
+    def get(self, playlist_id: str) -> Optional[Dict]:
+        """
+        Devuelve el avance registrado de una playlist, o None si no existe.
+        """
+        with self._lock:
+            return self.state["playlists"].get(playlist_id)
+
+    def completed(self, playlist_id: str, snapshot_id: Optional[str] = None) -> bool:
+        """
+        Indica si la playlist ya se completó en esta ejecución con el mismo
+        `snapshot_id`.
+        """
+        entry = self.get(playlist_id)
+
+        return (
+            entry is not None
+            and entry["status"] == "completed"
+            and entry["snapshot_id"] == snapshot_id
+        )
+
+    def start(
+        self,
+        playlist_id: str,
+        snapshot_id: Optional[str],
+        raw_path: str,
+        parquet_path: str,
+    ) -> int:
+        """
+        Marca la playlist como en curso y devuelve el offset desde el que se puede
+        reanudar: el de la última página guardada si la playlist quedó a medias con
+        el mismo `snapshot_id`, o 0 en otro caso.
+        """
+        with self._lock:
+            entry = self.state["playlists"].get(playlist_id)
+
+            offset = 0
+            if (
+                entry is not None
+                and entry["status"] == "in_progress"
+                and entry["snapshot_id"] == snapshot_id
+                and entry["raw_path"] == raw_path
+            ):
+                offset = entry["offset"]
+
+            self.state["playlists"][playlist_id] = {
+                "status": "in_progress",
+                "snapshot_id": snapshot_id,
+                "raw_path": raw_path,
+                "parquet_path": parquet_path,
+                "offset": offset,
+            }
+            self._save()
+
+        return offset
+
+    def checkpoint(self, playlist_id: str, offset: int) -> None:
+        """
+        Registra que las páginas hasta `offset` (exclusivo) están guardadas en bruto.
+        El archivo se escribe solo si pasaron `checkpoint_interval` segundos desde la
+        última escritura.
+        """
+        with self._lock:
+            self.state["playlists"][playlist_id]["offset"] = offset
+            if time.monotonic() - self._saved_at >= self.checkpoint_interval:
+                self._save()
+
+    def flush(self) -> None:
+        """
+        Escribe el archivo con el último offset registrado por `checkpoint`.
+        """
+        with self._lock:
+            self._save()
+
+    def complete(self, playlist_id: str) -> None:
+        """
+        Marca la playlist como completada (data en bruto y parquet escritos).
+        """
+        with self._lock:
+            self.state["playlists"][playlist_id]["status"] = "completed"
+            self._save()
+
+    def finish(self) -> None:
+        """
+        Marca la ejecución como terminada; la siguiente empieza de cero.
+        """
+        with self._lock:
+            self.state["finished"] = True
+            self._save()
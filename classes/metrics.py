@@ -0,0 +1,184 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from classes import utils
+
+# Segmentos de la ruta que son IDs: IDs de Spotify (base62 de 22 caracteres) o el
+# segmento que sigue a una colección (`/playlists/<id>`, `/users/<id>`, ...)
+SPOTIFY_ID = re.compile(r"^[0-9A-Za-z]{22}$")
+COLLECTIONS = {"albums", "artists", "audio-features", "playlists", "tracks", "users"}
+
+
+class EndpointStats:
+    """
+    Contadores y latencias de un endpoint.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.bytes = 0
+        self.latencies: List[float] = []
+
+
+class RequestMetrics:
+    """
+    Métricas por endpoint de las solicitudes a la API: cantidad de llamadas,
+    errores, reintentos, aciertos de caché, bytes recibidos y percentiles de
+    latencia. Las URLs se agrupan por plantilla (`GET /v1/playlists/{id}/tracks`),
+    sin los parámetros de consulta.
+
+    La latencia de una llamada incluye sus reintentos y las esperas del scheduler,
+    es decir, el tiempo que la extracción estuvo esperando ese endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        """
+        Plantilla de la ruta de una URL, con los IDs reemplazados por `{id}`.
+        """
+        segments = urlparse(url).path.strip("/").split("/")
+
+        template = []
+        for previous, segment in zip([""] + segments, segments):
+            if SPOTIFY_ID.match(segment) or previous in COLLECTIONS:
+                template.append("{id}")
+            else:
+                template.append(segment)
+
+        return "/" + "/".join(template)
+
+    def _stats(self, method: str, url: str) -> EndpointStats:
+        key = (method, self.endpoint(url))
+        if key not in self._endpoints:
+            self._endpoints[key] = EndpointStats()
+
+        return self._endpoints[key]
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        seconds: float,
+        status: Optional[int],
+        size: int = 0,
+        retries: int = 0,
+    ) -> None:
+        """
+        Registra una llamada a la API.
+
+        Parameters:
+            method (str): Método HTTP.
+            url (str): URL solicitada.
+            seconds (float): Duración total de la llamada, con reintentos.
+            status (Optional[int]): Código de estado final, o None si no hubo respuesta.
+            size (int): Bytes del cuerpo de la respuesta.
+            retries (int): Reintentos realizados.
+        """
+        with self._lock:
+            stats = self._stats(method, url)
+            stats.calls += 1
+            stats.errors += int(status is None or status >= 400)
+            stats.retries += retries
+            stats.bytes += size
+            stats.latencies.append(seconds)
+
+    def record_cache_hit(self, method: str, url: str) -> None:
+        """
+        Registra una respuesta servida desde la caché.
+        """
+        with self._lock:
+            self._stats(method, url).cache_hits += 1
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Devuelve las métricas por endpoint, ordenadas por tiempo total descendente.
+        Las latencias están en segundos.
+        """
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+
+        report = {}
+        for (method, endpoint), stats in sorted(
+            endpoints, key=lambda item: sum(item[1].latencies), reverse=True
+        ):
+            report[f"{method} {endpoint}"] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "retries": stats.retries,
+                "cache_hits": stats.cache_hits,
+                "bytes": stats.bytes,
+                "total_time": round(sum(stats.latencies), 4),
+                **{
+                    f"latency_{name}": round(value, 4)
+                    for name, value in utils.percentiles(stats.latencies).items()
+                },
+            }
+
+        return report
+
+    def save_json(self, path: str) -> None:
+        """
+        Guarda el reporte en un archivo JSON.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as fp:
+            json.dump(self.report(), fp, indent=2)
+
+    def prometheus(self) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus. Las latencias se
+        exportan como un summary con los cuantiles 0.5, 0.95 y 0.99.
+        """
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+        counters = [
+            ("spotify_requests_total", "Llamadas a la API.", "calls"),
+            ("spotify_request_errors_total", "Llamadas fallidas.", "errors"),
+            ("spotify_request_retries_total", "Reintentos.", "retries"),
+            ("spotify_cache_hits_total", "Respuestas servidas desde la caché.", "cache_hits"),
+            ("spotify_response_bytes_total", "Bytes recibidos.", "bytes"),
+        ]  # fmt: skip
+
+        lines = []
+        for name, help_text, attribute in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, endpoint), stats in endpoints:
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                lines.append(f"{name}{{{labels}}} {getattr(stats, attribute)}")
+
+        name = "spotify_request_duration_seconds"
+        lines += [
+            f"# HELP {name} Duración de las llamadas a la API, con reintentos.",
+            f"# TYPE {name} summary",
+        ]
+        for (method, endpoint), stats in endpoints:
+            labels = f'method="{method}",endpoint="{endpoint}"'
+            for quantile, value in utils.percentiles(stats.latencies).items():
+                lines.append(
+                    f'{name}{{{labels},quantile="{int(quantile[1:]) / 100}"}} {value}'
+                )
+            lines.append(f"{name}_sum{{{labels}}} {sum(stats.latencies)}")
+            lines.append(f"{name}_count{{{labels}}} {len(stats.latencies)}")
+
+        return "\n".join(lines) + "\n"
+
+    def save_prometheus(self, path: str) -> None:
+        """
+        Guarda las métricas en formato Prometheus, por ejemplo para el textfile
+        collector de node_exporter.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write(self.prometheus())
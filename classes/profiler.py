@@ -0,0 +1,176 @@
+import contextlib
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class StageStats:
+    """
+    Tiempos acumulados de una etapa en una playlist.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss = 0
+
+    def add(self, wall: float, cpu: float, peak_rss: int) -> None:
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+        self.peak_rss = max(self.peak_rss, peak_rss)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "wall": round(self.wall, 4),
+            "cpu": round(self.cpu, 4),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+        }
+
+
+class StageProfiler:
+    """
+    Mide cada etapa de la extracción de una playlist (solicitudes, escritura de la
+    data en bruto, aplanado, características de audio, unión y escritura de
+    parquet): tiempo real, tiempo de CPU y memoria RSS máxima.
+
+    El tiempo de CPU es el del proceso completo (incluye los hilos de
+    `audio_feature`), por lo que con varias playlists en paralelo (`--async`) las
+    etapas que se solapan comparten su CPU. La RSS máxima se muestrea cada
+    `interval` segundos mientras hay etapas activas; sin `psutil` no se mide.
+
+    Parameters:
+        interval (float): Segundos entre muestras de RSS.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], StageStats] = {}
+        self._active: List[List[int]] = []
+
+        self._process = psutil.Process() if psutil else None
+        self._stop = threading.Event()
+        self._thread = None
+        if self._process is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    def _rss(self) -> int:
+        return self._process.memory_info().rss if self._process else 0
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                if not self._active:
+                    continue
+
+                rss = self._rss()
+                for peak in self._active:
+                    peak[0] = max(peak[0], rss)
+
+    @contextlib.contextmanager
+    def stage(self, name: str, playlist_id: Optional[str] = None) -> Iterator[None]:
+        """
+        Mide el bloque como la etapa `name` de la playlist.
+
+        Ejemplo:
+            with profiler.stage("flatten", playlist_id):
+                ...
+        """
+        peak = [self._rss()]
+        with self._lock:
+            self._active.append(peak)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            rss = self._rss()
+
+            with self._lock:
+                # Por identidad: etapas concurrentes pueden tener la misma RSS
+                self._active = [active for active in self._active if active is not peak]
+                key = (playlist_id or "-", name)
+                if key not in self._stats:
+                    self._stats[key] = StageStats()
+                self._stats[key].add(wall, cpu, max(peak[0], rss))
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Devuelve las etapas acumuladas de todas las playlists (`stages`) y el
+        detalle por playlist (`playlists`), en segundos y MB.
+        """
+        with self._lock:
+            items = list(self._stats.items())
+
+        stages: Dict[str, StageStats] = {}
+        playlists: Dict[str, Dict[str, Any]] = {}
+        for (playlist_id, name), stats in items:
+            total = stages.setdefault(name, StageStats())
+            total.calls += stats.calls
+            total.wall += stats.wall
+            total.cpu += stats.cpu
+            total.peak_rss = max(total.peak_rss, stats.peak_rss)
+
+            playlists.setdefault(playlist_id, {})[name] = stats.as_dict()
+
+        return {
+            "stages": {
+                name: stats.as_dict()
+                for name, stats in sorted(
+                    stages.items(), key=lambda item: item[1].wall, reverse=True
+                )
+            },
+            "playlists": playlists,
+        }
+
+    def summary(self, top: int = 5) -> str:
+        """
+        Tabla de las etapas ordenadas por tiempo real y las `top` playlists más
+        lentas con su etapa dominante.
+        """
+        report = self.report()
+        total_wall = sum(stats["wall"] for stats in report["stages"].values()) or 1.0
+
+        lines = [
+            f"{'stage':<20}{'calls':>8}{'wall (s)':>11}{'cpu (s)':>10}"
+            f"{'share':>8}{'peak RSS (MB)':>15}"
+        ]
+        for name, stats in report["stages"].items():
+            lines.append(
+                f"{name:<20}{stats['calls']:>8}{stats['wall']:>11.2f}{stats['cpu']:>10.2f}"
+                f"{stats['wall'] / total_wall:>8.1%}{stats['peak_rss_mb']:>15.1f}"
+            )
+
+        slowest = sorted(
+            report["playlists"].items(),
+            key=lambda item: sum(stats["wall"] for stats in item[1].values()),
+            reverse=True,
+        )[:top]
+
+        if slowest:
+            lines.append("")
+            lines.append("Playlists más lentas:")
+        for playlist_id, stages in slowest:
+            wall = sum(stats["wall"] for stats in stages.values())
+            dominant = max(stages, key=lambda name: stages[name]["wall"])
+            lines.append(f"  {playlist_id:<24}{wall:>8.2f} s  (mayor: {dominant})")
+
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """
+        Detiene el muestreo de memoria.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,208 @@
+import glob
+import json
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+from classes.archive import read_archive
+from classes.dataset import PartitionedDataset
+from classes.feature_store import FeatureStore
+from classes.spotify import SpotifyAPI
+
+
+class RawPlaylist(NamedTuple):
+    """
+    Playlist extraída cuya data en bruto está en disco.
+    """
+
+    run_date: str
+    playlist_name: str
+    raw_path: str
+
+
+class OfflineSpotifyAPI(SpotifyAPI):
+    """
+    `SpotifyAPI` sin autenticación ni acceso a la red, para reprocesar la data en
+    bruto con el mismo `model_data`. Las características de audio se leen del
+    `FeatureStore` y, las que no estén almacenadas, de `fallback_features_path`
+    (por ejemplo, el `songs_features.parquet` de la extracción original); las
+    canciones que no estén en ninguno se omiten.
+
+    Parameters:
+        feature_store (FeatureStore): Almacén de características de audio.
+        dataset (Optional[PartitionedDataset]): Dataset particionado de salida.
+        fallback_features_path (Optional[str]): Archivo parquet de características
+            con la columna `song_id`, usado para las canciones que no estén en el
+            `FeatureStore`.
+    """
+
+    def __init__(
+        self,
+        feature_store: FeatureStore,
+        dataset: Optional[PartitionedDataset] = None,
+        fallback_features_path: Optional[str] = None,
+    ):
+        # Sin token: la autenticación solo se haría en una solicitud a la API
+        super().__init__(feature_store=feature_store, dataset=dataset)
+        self.fallback_features_path = fallback_features_path
+        self._fallback_features: Optional[Dict[str, Dict]] = None
+
+    def fallback_features(self) -> Dict[str, Dict]:
+        """
+        Características de `fallback_features_path` por ID de canción, leídas una vez.
+        """
+        if self._fallback_features is None:
+            self._fallback_features = {}
+
+            path = self.fallback_features_path
+            if path and os.path.exists(path):
+                df = pd.read_parquet(path).rename(columns={"song_id": "id"})
+                self._fallback_features = {
+                    row["id"]: row for row in df.to_dict("records")
+                }
+
+        return self._fallback_features
+
+    def get_requests(self, url: str, *args, **kwargs) -> Dict:
+        raise RuntimeError(f"Solicitud a la API en modo offline: {url}")
+
+    def audio_feature(
+        self, song_id: Union[str, Iterable[str]], max_workers: int = 4
+    ) -> pd.DataFrame:
+        song_ids = [song_id] if isinstance(song_id, str) else list(song_id)
+        features = self.feature_store.get_many(song_ids)
+
+        # Las canciones que no están en el almacén, de la extracción original
+        missing_ids = [track_id for track_id in song_ids if track_id not in features]
+        if missing_ids:
+            fallback = self.fallback_features()
+            features.update(
+                {
+                    track_id: fallback[track_id]
+                    for track_id in missing_ids
+                    if track_id in fallback
+                }
+            )
+
+        audio_features = pd.DataFrame(
+            [features[track_id] for track_id in song_ids if track_id in features],
+            columns=None if features else ["id"],
+        )
+
+        return audio_features.rename(columns={"id": "song_id"})
+
+
+def find_raw_playlists(root: str = "api_data") -> List[RawPlaylist]:
+    """
+    Busca los directorios `raw_data` con páginas guardadas bajo
+    `<root>/<fecha>/<playlist>/raw_data`.
+
+    Parameters:
+        root (str): Directorio raíz de la data extraída.
+
+    Returns:
+        List[RawPlaylist]: Playlists encontradas, ordenadas por fecha y nombre.
+    """
+    playlists = []
+    for raw_path in sorted(glob.glob(os.path.join(root, "*", "*", "raw_data"))):
+        if not os.listdir(raw_path):
+            continue
+
+        playlist_path = os.path.dirname(raw_path)
+        playlists.append(
+            RawPlaylist(
+                run_date=os.path.basename(os.path.dirname(playlist_path)),
+                playlist_name=os.path.basename(playlist_path),
+                raw_path=raw_path,
+            )
+        )
+
+    return playlists
+
+
+def load_raw_pages(raw_path: str) -> List[Dict]:
+    """
+    Lee las páginas en bruto de una playlist, ya sea del archivo NDJSON comprimido
+    o de los archivos `data_<offset>.json`.
+
+    Parameters:
+        raw_path (str): Directorio `raw_data` de la playlist.
+
+    Returns:
+        List[Dict]: Las respuestas JSON de cada página, en orden.
+    """
+    archives = glob.glob(os.path.join(raw_path, "pages.ndjson.*"))
+    if archives:
+        return list(read_archive(archives[0]))
+
+    def offset(path: str) -> int:
+        return int(re.search(r"data_(\d+)\.json$", path).group(1))
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(raw_path, "data_*.json")), key=offset):
+        with open(path) as fp:
+            pages.append(json.load(fp))
+
+    return pages
+
+
+def playlist_id_from_pages(pages: List[Dict]) -> Optional[str]:
+    """
+    Obtiene el ID de la playlist a partir del `href` de sus páginas.
+    """
+    for page in pages:
+        match = re.search(r"/playlists/([^/]+)/tracks", page.get("href") or "")
+        if match:
+            return match.group(1)
+
+    return None
+
+
+def replay_playlist(
+    playlist: RawPlaylist,
+    output_root: str,
+    feature_store_path: str,
+    dataset_root: Optional[str] = None,
+) -> int:
+    """
+    Reprocesa una playlist a partir de su data en bruto y escribe sus archivos
+    parquet en `<output_root>/<fecha>/<playlist>/parquet_data`. Se ejecuta en un
+    proceso del pool, por lo que abre su propio `FeatureStore`. Las características
+    que no estén en el almacén se toman del `parquet_data` original de la playlist.
+
+    Parameters:
+        playlist (RawPlaylist): Playlist a reprocesar.
+        output_root (str): Directorio raíz de salida.
+        feature_store_path (str): Ruta del `FeatureStore`.
+        dataset_root (Optional[str]): Raíz del dataset particionado, si se usa esa salida.
+
+    Returns:
+        int: Cantidad de tracks reprocesados.
+    """
+    pages = load_raw_pages(playlist.raw_path)
+    playlist_data = [item for page in pages for item in page["items"]]
+
+    dataset = PartitionedDataset(dataset_root) if dataset_root else None
+    spotify = OfflineSpotifyAPI(
+        FeatureStore(feature_store_path),
+        dataset=dataset,
+        fallback_features_path=os.path.join(
+            os.path.dirname(playlist.raw_path), "parquet_data", "songs_features.parquet"
+        ),
+    )
+
+    parquet_path = os.path.join(
+        output_root, playlist.run_date, playlist.playlist_name, "parquet_data"
+    )
+    os.makedirs(parquet_path, exist_ok=True)
+
+    spotify.model_data(
+        playlist_data=playlist_data,
+        parquet_path=parquet_path,
+        playlist_id=playlist_id_from_pages(pages) or playlist.playlist_name,
+        run_date=playlist.run_date,
+    )
+
+    return len(playlist_data)
@@ -0,0 +1,202 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from classes import utils
+from classes.spotify import SpotifyAPI
+
+
+class TrackResolver:
+    """
+    Resuelve pares (canción, artista), como los de `billboard_hot_100`, a IDs de
+    tracks de Spotify.
+
+    Las búsquedas se ejecutan en paralelo y su resultado se guarda en una caché
+    persistente por (título normalizado, artista normalizado), de modo que en los
+    charts semanales solo se buscan las entradas nuevas. Las búsquedas sin
+    resultado se guardan durante `miss_ttl` segundos, para volver a buscar las
+    canciones que todavía no estaban en Spotify. Las búsquedas que fallan (por
+    ejemplo, un 429 tras los reintentos) devuelven None y no se guardan.
+
+    Parameters:
+        spotify (SpotifyAPI): Instancia autenticada de `SpotifyAPI`.
+        cache_path (str): Ruta del archivo SQLite de la caché.
+        max_workers (int): Cantidad de búsquedas en paralelo.
+        miss_ttl (float): Segundos que se guarda una búsqueda sin resultado.
+    """
+
+    def __init__(
+        self,
+        spotify: SpotifyAPI,
+        cache_path: str = "api_data/track_resolver.sqlite",
+        max_workers: int = 8,
+        miss_ttl: float = 7 * 24 * 3600,
+    ):
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.spotify = spotify
+        self.max_workers = max_workers
+        self.miss_ttl = miss_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                song TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                track_id TEXT,
+                searched_at REAL,
+                PRIMARY KEY (song, artist)
+            )
+            """)
+
+        # Cachés creadas antes de `searched_at`; sus búsquedas sin resultado se repiten
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(tracks)")]
+        if "searched_at" not in columns:
+            self._conn.execute("ALTER TABLE tracks ADD COLUMN searched_at REAL")
+        self._conn.commit()
+
+        self.total = 0
+        self.resolved = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.latencies: List[float] = []
+
+    @staticmethod
+    def key(song: str, artist: str) -> Tuple[str, str]:
+        """
+        Llave normalizada de un par (canción, artista).
+        """
+        return utils.normalize_text(song), utils.normalize_text(artist)
+
+    def _cached(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Any]:
+        cached = {}
+        expired = time.time() - self.miss_ttl
+
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT track_id, searched_at FROM tracks"
+                    " WHERE song = ? AND artist = ?",
+                    key,
+                ).fetchone()
+
+                if row is None:
+                    continue
+
+                # Las búsquedas sin resultado vencen tras `miss_ttl`
+                track_id, searched_at = row
+                if track_id is None and (searched_at is None or searched_at < expired):
+                    continue
+
+                cached[key] = track_id
+
+        return cached
+
+    def _search(self, song: str, artist: str) -> Optional[str]:
+        # Buscar con el artista principal, sin los artistas invitados
+        start = time.perf_counter()
+        track_id = self.spotify.track_search(
+            song_name=song, artist_name=utils.normalize_text(artist) or artist
+        )
+
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+
+        return track_id
+
+    def resolve(self, pairs: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        Resuelve una lista de pares (canción, artista) a IDs de tracks.
+
+        Parameters:
+            pairs (List[Tuple[str, str]]): Pares (canción, artista).
+
+        Returns:
+            List[Optional[str]]: ID de cada par, en el mismo orden, o None si no se
+            encontró o la búsqueda falló.
+        """
+        keys = [self.key(song, artist) for song, artist in pairs]
+        track_ids = self._cached(set(keys))
+
+        # Buscar en paralelo solo los pares que no están en la caché
+        pending = {}
+        for key, pair in zip(keys, pairs):
+            if key not in track_ids and key not in pending:
+                pending[key] = pair
+
+        def search(pair: Tuple[str, str]) -> Tuple[Optional[str], bool]:
+            # Un error no descarta las demás búsquedas del lote
+            try:
+                return self._search(*pair), True
+            except Exception:
+                return None, False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            searched = dict(zip(pending.keys(), executor.map(search, pending.values())))
+
+        # Guardar solo las búsquedas que terminaron, con o sin resultado
+        now = time.time()
+        rows = [
+            (song, artist, track_id, now)
+            for (song, artist), (track_id, ok) in searched.items()
+            if ok
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks (song, artist, track_id, searched_at)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+        track_ids.update({key: track_id for key, (track_id, _) in searched.items()})
+        result = [track_ids[key] for key in keys]
+
+        self.errors += sum(not ok for _, ok in searched.values())
+
+        self.total += len(result)
+        self.resolved += sum(track_id is not None for track_id in result)
+        self.cache_hits += sum(key not in pending for key in keys)
+
+        return result
+
+    def resolve_chart(self, chart: pd.DataFrame) -> pd.DataFrame:
+        """
+        Agrega la columna `track_id` a un chart con columnas `song` y `artist`.
+
+        Parameters:
+            chart (pd.DataFrame): Chart, por ejemplo el de `billboard_hot_100`.
+
+        Returns:
+            pd.DataFrame: Copia del chart con la columna `track_id`.
+        """
+        chart = chart.copy()
+        chart["track_id"] = self.resolve(list(zip(chart["song"], chart["artist"])))
+
+        return chart
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Devuelve la tasa de resolución, los aciertos de caché y los percentiles de
+        latencia (en segundos) de las búsquedas realizadas.
+        """
+        return {
+            "total": self.total,
+            "resolved": self.resolved,
+            "resolution_rate": (
+                round(self.resolved / self.total, 4) if self.total else 0.0
+            ),
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "searches": len(self.latencies),
+            **{
+                f"latency_{name}": round(value, 4)
+                for name, value in utils.percentiles(self.latencies).items()
+            },
+        }
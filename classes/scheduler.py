@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+# Códigos de estado que se reintentan
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class SpotifyRequestError(Exception):
+    """
+    Error de una solicitud a la API que no se pudo completar tras los reintentos.
+
+    Attributes:
+        status_code (Optional[int]): Código de estado HTTP de la última respuesta.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Limitador de tasa tipo token bucket, seguro entre hilos. Se puede pausar con
+    `block` (por ejemplo, ante un 429 con `Retry-After`); durante la pausa no se
+    reponen tokens y todas las reservas esperan a que termine.
+
+    Parameters:
+        rate (float): Tokens que se reponen por segundo.
+        capacity (int): Cantidad máxima de tokens acumulados (ráfaga).
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, until: float) -> None:
+        # Se llama con el bloqueo tomado
+        if until > self._updated:
+            self._tokens = min(
+                self.capacity, self._tokens + (until - self._updated) * self.rate
+            )
+            self._updated = until
+
+    def reserve(self) -> float:
+        """
+        Reserva un token y devuelve los segundos que hay que esperar antes de usarlo.
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            # Durante una pausa, el token se reserva a partir de su fin
+            start = max(now, self._blocked_until)
+            self._refill(start)
+            self._tokens -= 1
+
+            return (start - now) + max(-self._tokens, 0.0) / self.rate
+
+    def block(self, seconds: float) -> None:
+        """
+        Pausa el bucket `seconds` segundos. Al terminar la pausa las solicitudes
+        se reanudan a la tasa estable, sin ráfaga.
+        """
+        with self._lock:
+            now = time.monotonic()
+            until = now + seconds
+            if until <= self._blocked_until:
+                return
+
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, until)
+            self._blocked_until = until
+
+    def paused(self) -> float:
+        """
+        Segundos que faltan para que termine la pausa actual, o 0.
+        """
+        with self._lock:
+            return max(self._blocked_until - time.monotonic(), 0.0)
+
+
+class RequestScheduler:
+    """
+    Programa las solicitudes HTTP: limita la tasa con un token bucket, respeta el
+    `Retry-After` de las respuestas 429 y reintenta los errores 5xx con backoff
+    exponencial con jitter.
+
+    Parameters:
+        rate (float): Solicitudes por segundo permitidas en régimen estable.
+        burst (int): Tamaño máximo de ráfaga.
+        max_retries (int): Reintentos máximos por solicitud.
+        backoff_base (float): Espera base en segundos del backoff exponencial.
+        backoff_max (float): Espera máxima en segundos entre reintentos.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.bucket = TokenBucket(rate=rate, capacity=burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttle_waits = 0
+        self.sleep_time = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores del scheduler.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttle_waits": self.throttle_waits,
+                "sleep_time": round(self.sleep_time, 3),
+            }
+
+    def _count(self, retry: bool = False, throttled: bool = False, sleep: float = 0.0):
+        with self._lock:
+            self.requests += 1
+            self.retries += int(retry)
+            self.throttle_waits += int(throttled)
+            self.sleep_time += sleep
+
+    @staticmethod
+    def retry_after(headers: Mapping[str, str]) -> float:
+        """
+        Segundos indicados por la cabecera `Retry-After` de una respuesta 429.
+        """
+        try:
+            return float(headers.get("Retry-After", 1))
+        except ValueError:
+            return 1.0
+
+    def retry_delay(
+        self, attempt: int, status: Optional[int], headers: Mapping[str, str]
+    ) -> Optional[float]:
+        """
+        Calcula la espera antes de reintentar una solicitud.
+
+        Parameters:
+            attempt (int): Número de intento (0 para el primero).
+            status (Optional[int]): Código de estado recibido, o None si hubo un error de conexión.
+            headers (Mapping[str, str]): Cabeceras de la respuesta.
+
+        Returns:
+            Optional[float]: Segundos a esperar, o None si no se debe reintentar.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        if status == 429:
+            # Respetar el tiempo indicado por la API
+            return self.retry_after(headers)
+
+        if status is None or status in RETRY_STATUS:
+            # Backoff exponencial con jitter completo
+            return random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2**attempt)
+            )
+
+        return None
+
+    def execute(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Ejecuta una solicitud síncrona aplicando la limitación de tasa y los reintentos.
+
+        Parameters:
+            send (Callable[[], requests.Response]): Función que realiza la solicitud.
+
+        Returns:
+            requests.Response: La última respuesta recibida.
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            if wait:
+                time.sleep(wait)
+
+            # Un 429 de otra solicitud pudo pausar el bucket durante la espera
+            pause = self.bucket.paused()
+            while pause:
+                time.sleep(pause)
+                wait += pause
+                pause = self.bucket.paused()
+
+            try:
+                response = send()
+                status, headers = response.status_code, response.headers
+            except (requests.ConnectionError, requests.Timeout):
+                response, status, headers = None, None, {}
+
+            # Pausar a todos los hilos y corrutinas que comparten el bucket
+            if status == 429:
+                self.bucket.block(self.retry_after(headers))
+
+            delay = self.retry_delay(attempt, status, headers)
+            self._count(
+                retry=attempt > 0, throttled=status == 429, sleep=wait + (delay or 0)
+            )
+
+            if delay is None:
+                if response is None:
+                    raise SpotifyRequestError("No se pudo conectar con la API")
+                return response
+
+            time.sleep(delay)
+            attempt += 1
+
+    async def execute_async(
+        self, send: Callable[[], Awaitable[Tuple[int, Mapping[str, str], Any]]]
+    ) -> Tuple[int, Mapping[str, str], Any]:
+        """
+        Versión asíncrona de `execute`.
+
+        Parameters:
+            send (Callable): Corrutina que realiza la solicitud y devuelve
+                (código de estado, cabeceras, contenido).
+
+        Returns:
+            Tuple[int, Mapping[str, str], Any]: El resultado de la última solicitud.
+        """
+        import asyncio
+
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+
+            # Un 429 de otra solicitud pudo pausar el bucket durante la espera
+            pause = self.bucket.paused()
+            while pause:
+                await asyncio.sleep(pause)
+                wait += pause
+                pause = self.bucket.paused()
+
+            try:
+                result = await send()
+                status, headers = result[0], result[1]
+            except (ConnectionError, asyncio.TimeoutError):
+                result, status, headers = None, None, {}
+
+            # Pausar a todos los hilos y corrutinas que comparten el bucket
+            if status == 429:
+                self.bucket.block(self.retry_after(headers))
+
+            delay = self.retry_delay(attempt, status, headers)
+            self._count(
+                retry=attempt > 0, throttled=status == 429, sleep=wait + (delay or 0)
+            )
+
+            if delay is None:
+                if result is None:
+                    raise SpotifyRequestError("No se pudo conectar con la API")
+                return result
+
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,91 @@
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Valores por defecto del pool de conexiones compartido
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 32
+TIMEOUT = (5, 30)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """
+    Sesión HTTP con un pool de conexiones keep-alive y un timeout por defecto.
+
+    Todas las solicitudes que pasan por la misma sesión reutilizan las conexiones
+    TCP+TLS abiertas hacia cada host en lugar de abrir una nueva por solicitud.
+
+    Parameters:
+        pool_connections (int): Cantidad de pools por host que se mantienen en caché.
+        pool_maxsize (int): Cantidad máxima de conexiones abiertas por host.
+        timeout (Union[float, Tuple[float, float]]): Timeout (conexión, lectura) por defecto.
+        keep_alive (bool): Si es False, se cierra la conexión al terminar cada solicitud.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        timeout: Union[float, Tuple[float, float]] = TIMEOUT,
+        keep_alive: bool = True,
+    ):
+        super().__init__()
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+
+    def request(self, method, url, **kwargs):
+        # Aplicar el timeout por defecto si la llamada no especifica uno
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session() -> PooledSession:
+    """
+    Devuelve la sesión HTTP compartida del proceso, creándola si no existe.
+
+    Returns:
+        PooledSession: Sesión compartida por `SpotifyAPI` y `billboard`.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession()
+
+        return _session
+
+
+def configure_session(**kwargs) -> PooledSession:
+    """
+    Reemplaza la sesión HTTP compartida por una nueva con la configuración dada.
+
+    Parameters:
+        **kwargs: Argumentos de `PooledSession` (pool_connections, pool_maxsize, timeout, keep_alive).
+
+    Returns:
+        PooledSession: La nueva sesión compartida.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+
+        _session = PooledSession(**kwargs)
+
+        return _session
@@ -1,19 +1,152 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Union
-
-import pandas as pd
-import requests
-import spotipy.util as util
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    TYPE_CHECKING,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from classes import utils
+from classes.archive import EXTENSIONS, RawArchiveWriter
+from classes.cache import ResponseCache
 from classes.env import EnvAttr
+from classes.feature_store import FeatureStore
+from classes.metrics import RequestMetrics
+from classes.scheduler import RequestScheduler, SpotifyRequestError
+from classes.sync import SnapshotState
+
+# pandas, pyarrow, requests y spotipy se importan al usarse, para que importar
+# este módulo y crear la instancia sea inmediato
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
+
+    from classes.auth import StaticToken, TokenManager
+    from classes.dataset import PartitionedDataset
+    from classes.manifest import RunManifest
+    from classes.profiler import StageProfiler
+
+
+# URL base de la API. Se puede cambiar con `SPOTIFY_API_BASE_URL` o `base_url`, por
+# ejemplo para usar el servidor local de `benchmarks/mock_server.py`
+API_BASE_URL = "https://api.spotify.com/v1"
+
+
+def year_month_day() -> str:
+    """
+    Fecha actual en formato YYYY-MM-DD, usada como fecha de ejecución.
+    """
+    return datetime.today().strftime("%Y-%m-%d")
+
+
+def month_year() -> str:
+    """
+    Mes y año actuales, usados en el nombre de las playlists creadas.
+    """
+    return datetime.today().strftime("%B, %Y")
 
-YEAR_MONTH_DAY = datetime.today().strftime("%Y-%m-%d")
-MONTH_YEAR = datetime.today().strftime("%B, %Y")
+
+def __getattr__(name: str) -> str:
+    # `YEAR_MONTH_DAY` y `MONTH_YEAR` se calculan al leerse, no al importar el módulo
+    if name == "YEAR_MONTH_DAY":
+        return year_month_day()
+    if name == "MONTH_YEAR":
+        return month_year()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class SpotifyAPI:
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        cache: Optional[ResponseCache] = None,
+        snapshots: Optional[SnapshotState] = None,
+        feature_store: Optional[FeatureStore] = None,
+        dataset: Optional[PartitionedDataset] = None,
+        raw_archive: Optional[Literal["gzip", "zstd"]] = None,
+        merge_data: bool = True,
+        token_manager: Optional[TokenManager] = None,
+        auth_mode: Literal["user", "client_credentials"] = "user",
+        metrics: Optional[RequestMetrics] = None,
+        profiler: Optional[StageProfiler] = None,
+        base_url: Optional[str] = None,
+        manifest: Optional[RunManifest] = None,
+    ):
+        from classes.session import get_session
+
+        # URL base de la API de Spotify
+        self.base_url = (
+            base_url or os.environ.get("SPOTIFY_API_BASE_URL") or API_BASE_URL
+        ).rstrip("/")
+
+        # Sesión HTTP con pool de conexiones keep-alive compartida entre solicitudes
+        self.session = session or get_session()
+
+        # Limitación de tasa y reintentos ante 429/5xx
+        self.scheduler = scheduler or RequestScheduler()
+
+        # Caché persistente opcional de las respuestas GET
+        self.cache = cache
+
+        # Estado de la sincronización incremental por snapshot_id
+        self.snapshots = snapshots
+
+        # Almacén persistente de características de audio por ID de canción
+        self.feature_store = feature_store
+
+        # Dataset particionado opcional en lugar de cinco archivos por playlist
+        self.dataset = dataset
+
+        # Compresión del archivo NDJSON de páginas en bruto; None guarda un JSON por página
+        self.raw_archive = raw_archive
+
+        # Si es False no se genera la tabla consolidada `merge_data`
+        self.merge_data = merge_data
+
+        # Métricas por endpoint de las solicitudes a la API
+        self.metrics = metrics
+
+        # Tiempos, CPU y memoria por etapa de cada playlist
+        self.profiler = profiler
+
+        # Avance de la ejecución, para reanudarla si se interrumpe
+        self.manifest = manifest
+
+        # Token de acceso renovado en segundo plano antes de expirar. Si no se
+        # indica, la autenticación se hace en la primera solicitud a la API
+        self.token_manager = token_manager
+        self.auth_mode = auth_mode
+        self._auth_lock = threading.Lock()
+
+    def _create_token_manager(self) -> Optional[Union[TokenManager, StaticToken]]:
+        import requests
+
+        from classes.auth import StaticToken, TokenManager
+
+        # Token fijo, sin credenciales ni renovación
+        if os.environ.get("SPOTIFY_ACCESS_TOKEN"):
+            return StaticToken(os.environ["SPOTIFY_ACCESS_TOKEN"])
+
         try:
             # Cargar credenciales desde variables de entorno o un archivo
             credentials = EnvAttr(json_path="config/secret.json")
@@ -28,61 +161,156 @@ class SpotifyAPI:
 
             # Crear un objeto para proporcionar autorización para acceder a los datos
             if self.__CLIENT_ID and self.__CLIENT_SECRET:
-                self.__access_token = util.prompt_for_user_token(
-                    username=self.__USERNAME,
+                return TokenManager(
                     client_id=self.__CLIENT_ID,
                     client_secret=self.__CLIENT_SECRET,
+                    mode=self.auth_mode,
+                    username=self.__USERNAME,
                     redirect_uri=self.__REDIRECT_URI,
                     scope=self.__scope,
                 )
-                self.__headers = {
-                    "Authorization": f"Bearer {self.__access_token}",
-                    "Content-Type": "application/json",
-                }
 
         except requests.exceptions.RequestException as e:
             raise Exception(
                 "No se pudo autenticar con la API de Spotify. Por favor, verifique sus credenciales."
             )
 
-    def get_requests(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+        return None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        Cabeceras de autorización usadas en cada solicitud a la API, con el token
+        vigente. La primera vez que se leen se hace la autenticación.
+        """
+        if self.token_manager is None:
+            with self._auth_lock:
+                if self.token_manager is None:
+                    self.token_manager = self._create_token_manager()
+
+        return self.token_manager.headers
+
+    def profile_stage(
+        self, name: str, playlist_id: Optional[str] = None
+    ) -> ContextManager[None]:
+        """
+        Mide el bloque como una etapa de la playlist con el `StageProfiler`
+        configurado; sin profiler no hace nada.
+        """
+        if self.profiler is None:
+            return contextlib.nullcontext()
+
+        return self.profiler.stage(name, playlist_id)
+
+    def _execute(
+        self, method: str, url: str, send: Callable[[], requests.Response]
+    ) -> requests.Response:
+        # Ejecuta la solicitud con el scheduler y registra sus métricas
+        if self.metrics is None:
+            return self.scheduler.execute(send)
+
+        attempts = 0
+
+        def attempt() -> requests.Response:
+            nonlocal attempts
+            attempts += 1
+            return send()
+
+        response = None
+        start = time.perf_counter()
+        try:
+            response = self.scheduler.execute(attempt)
+            return response
+        finally:
+            self.metrics.record(
+                method,
+                url,
+                time.perf_counter() - start,
+                status=response.status_code if response is not None else None,
+                size=len(response.content) if response is not None else 0,
+                retries=max(attempts - 1, 0),
+            )
+
+    def get_requests(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> Dict:
         """
         Realiza una solicitud HTTP GET a la URL especificada con parámetros de consulta opcionales.
+        Si hay una caché configurada, se consulta antes y se revalida con `If-None-Match`.
 
         Parámetros:
             url (str): La URL a la cual se realiza la solicitud.
             params (Optional[Dict[str, Any]]): Parámetros de consulta opcionales para la solicitud.
+            snapshot_id (Optional[str]): Snapshot de la playlist; si no cambió, se usa la respuesta en caché.
 
         Retorna:
             Dict: La respuesta JSON de la solicitud.
 
         Lanza:
-            Exception: Si la solicitud falla o el código de estado de la respuesta no es 200.
+            SpotifyRequestError: Si la solicitud falla tras los reintentos o el código de estado de la respuesta no es 200.
         """
-        if not params:
-            # Realizar solicitud GET sin parámetros
-            response = requests.get(url, headers=self.__headers)
-        else:
-            # Realizar solicitud GET con parámetros
-            response = requests.get(url, headers=self.__headers, params=params)
+        headers = self.headers
+        cached = self.cache.get(url, params, snapshot_id) if self.cache else None
+
+        if cached is not None:
+            if cached.fresh:
+                if self.metrics:
+                    self.metrics.record_cache_hit("GET", url)
+                return cached.payload
+
+            # Revalidar la respuesta almacenada con su ETag
+            if cached.etag:
+                headers = {**headers, "If-None-Match": cached.etag}
+
+        # Realizar solicitud GET, con limitación de tasa y reintentos
+        response = self._execute(
+            "GET", url, lambda: self.session.get(url, headers=headers, params=params)
+        )
+
+        if response.status_code == 304 and cached is not None:
+            if self.metrics:
+                self.metrics.record_cache_hit("GET", url)
+            self.cache.revalidated(cached)
+            return cached.payload
 
         if response.status_code not in (200, 201):
-            raise Exception("Error al recuperar los datos")
+            raise SpotifyRequestError(
+                "Error al recuperar los datos", response.status_code
+            )
+
+        if self.cache:
+            self.cache.put(
+                url,
+                params,
+                response.content,
+                etag=response.headers.get("ETag"),
+                snapshot_id=snapshot_id,
+            )
+
         return response.json()
 
     def post_requests(self, url: str, data: Dict) -> Dict:
-        response = requests.post(url, headers=self.__headers, json=data)
+        response = self._execute(
+            "POST",
+            url,
+            lambda: self.session.post(url, headers=self.headers, json=data),
+        )
 
         if response.status_code not in (200, 201):
-            raise Exception("Error creating playlist")
+            raise SpotifyRequestError("Error creating playlist", response.status_code)
 
         return response.json()
 
-    def put_requests(self, url: str) -> Dict:
-        response = requests.put(url, headers=self.__headers)
+    def put_requests(self, url: str, data: Optional[Dict] = None) -> Dict:
+        response = self._execute(
+            "PUT", url, lambda: self.session.put(url, headers=self.headers, json=data)
+        )
 
         if response.status_code not in (200, 201):
-            raise Exception("Error creating playlist")
+            raise SpotifyRequestError("Error creating playlist", response.status_code)
 
         return response.json()
 
@@ -93,19 +321,56 @@ class SpotifyAPI:
         Returns:
            response (Dict): La respuesta JSON con la data del usuario.
         """
-        response = self.get_requests(url="https://api.spotify.com/v1/me")
+        response = self.get_requests(url=f"{self.base_url}/me")
 
         return response
 
-    def get_tops_user(
+    def iter_tops_user(
         self,
         type: str,
         time_range: Literal["short_term", "medium_term", "long_term"] = "long_term",
         limit: int = 50,
         offset: int = 0,
-    ) -> Dict:
+    ) -> Iterator[Dict]:
+        """
+        Itera sobre los tops del usuario (`artists` o `tracks`) página por página,
+        avanzando el offset de a `limit` hasta que no haya más resultados.
+
+        Parameters:
+            type (str): `artists` o `tracks`.
+            time_range (str): The time range for the top items.
+            limit (int): Cantidad de items por página (máximo 50).
+            offset (int): Índice del primer item a devolver.
+
+        Yields:
+            Dict: Cada item del top, en orden.
         """
-        Get the current user's top tracks based on calculated affinity over the last several years.
+        while True:
+            params = {"time_range": time_range, "limit": limit, "offset": offset}
+
+            response = self.get_requests(
+                url=f"{self.base_url}/me/top/{type}",
+                params=params,
+            )
+
+            yield from response["items"]
+            offset += limit
+
+            # Terminar cuando no hay más páginas
+            if response["next"] is None or offset >= response["total"]:
+                break
+
+    def get_tops_user(
+        self,
+        type: str,
+        time_range: Union[
+            Literal["short_term", "medium_term", "long_term"], Iterable[str]
+        ] = "long_term",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Union[List[Dict], Dict[str, List[Dict]]]:
+        """
+        Get the current user's top artists or tracks based on calculated affinity.
 
         The `time_range` parameter can be one of the following values:
 
@@ -113,34 +378,42 @@ class SpotifyAPI:
         * `medium_term`: The last 6 months
         * `long_term`: The last year
 
+        If several time ranges are given, they are fetched concurrently.
+
         Parameters:
-            time_range (str): The time range for the top tracks.
-            limit (int): The maximum number of tracks to return. Default: 50.
-            offset (int): The index of the first track to return. Default: 0 (the first track).
+            type (str): `artists` or `tracks`.
+            time_range (Union[str, Iterable[str]]): The time range (or time ranges) for the top items.
+            limit (int): The page size of each request. Default: 50.
+            offset (int): The index of the first item to return. Default: 0 (the first item).
 
         Returns:
-            Dict: The JSON response from the request.
+            Union[List[Dict], Dict[str, List[Dict]]]: The top items without duplicates, or a
+            dictionary of top items per time range when several time ranges are given.
 
         Raises:
-            Exception: If the request fails or the response status code is not 200.
+            SpotifyRequestError: If the request fails or the response status code is not 200.
         """
 
-        # Configurar los parámetros de la consulta
-        top = []
-        for offset in range(0, 50):
-            params = {
-                "time_range": time_range,
-                "limit": limit,
-                "offset": offset,
-            }
+        if not isinstance(time_range, str):
+            # Obtener los distintos periodos de forma concurrente
+            time_ranges = list(time_range)
+            if not time_ranges:
+                return {}
 
-            response = self.get_requests(
-                url=f"https://api.spotify.com/v1/me/top/{type}",
-                params=params,
-            )
+            with ThreadPoolExecutor(max_workers=len(time_ranges)) as executor:
+                tops = executor.map(
+                    lambda period: self.get_tops_user(type, period, limit, offset),
+                    time_ranges,
+                )
 
-            # Agregar los tracks a la lista de resultados
-            top += response["items"]
+                return dict(zip(time_ranges, tops))
+
+        # Eliminar duplicados por id conservando el orden
+        top, seen = [], set()
+        for item in self.iter_tops_user(type, time_range, limit, offset):
+            if item["id"] not in seen:
+                seen.add(item["id"])
+                top.append(item)
 
         return top
 
@@ -161,9 +434,9 @@ class SpotifyAPI:
         """
 
         user_id = self.user_info()["id"]
-        url = f"https://api.spotify.com/v1/users/{user_id}/playlists"
+        url = f"{self.base_url}/users/{user_id}/playlists"
         data = {
-            "name": f"{name} {MONTH_YEAR}",
+            "name": f"{name} {month_year()}",
             "description": description,
             "public": public,
         }
@@ -172,55 +445,71 @@ class SpotifyAPI:
 
         return response["id"]
 
-    def add_tracks_to_playlist(self, playlist_id: str, track_uris: pd.Series) -> Dict:
+    def add_tracks_to_playlist(
+        self,
+        playlist_id: str,
+        track_uris: Iterable[str],
+        replace: bool = True,
+        chunk_size: int = 100,
+    ) -> Optional[str]:
         """
-        Adds tracks to a playlist in Spotify.
+        Writes tracks to a playlist in Spotify, in chunks of up to 100 URIs sent in
+        the JSON body.
+
+        The first chunk replaces the playlist contents (`PUT`) and the following
+        ones are appended (`POST`) to the end, so the final order is the order of
+        `track_uris`. The chunks are uploaded one after the other over the shared
+        keep-alive session while the next one is built lazily from the iterable;
+        concurrent appends could land out of order, and concurrent positional
+        inserts fail because Spotify rejects a position beyond the current length.
 
         Parameters:
-            playlist_id (str): The Spotify ID of the playlist to which to add tracks.
-            track_uris (List[str]): A list of Spotify URIs of the tracks to add to the playlist.
-            position (Optional[int]): The position in the playlist where to insert the tracks.
+            playlist_id (str): The Spotify ID of the playlist to write to.
+            track_uris (Iterable[str]): Track IDs or `spotify:track:` URIs, in order. Any iterable is accepted.
+            replace (bool): Whether the first chunk replaces the playlist contents. If False, every chunk is appended.
+            chunk_size (int): URIs per request, between 1 and 100.
 
         Returns:
-            dict: The JSON response from the Spotify API.
+            Optional[str]: The playlist snapshot_id after the last request, or None if nothing was sent.
 
         Raises:
-            Exception: If the request fails or the response status code is not 200.
+            ValueError: If `chunk_size` is not between 1 and 100.
+            SpotifyRequestError: If a request fails.
         """
 
-        if isinstance(track_uris, pd.Series) and len(track_uris) <= 100:
-            songs_ids = ",".join(
-                ["spotify:track:" + track_id for track_id in track_uris]
-            )
-            url = f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks?uris={songs_ids}"
-            self.put_requests(url)
+        if not 1 <= chunk_size <= 100:
+            raise ValueError("chunk_size debe estar entre 1 y 100")
 
-            return f"Canciones añadidas a playlist"
+        url = f"{self.base_url}/playlists/{playlist_id}/tracks"
+        uris = (
+            uri if uri.startswith("spotify:") else "spotify:track:" + uri
+            for uri in track_uris
+        )
 
-        elif isinstance(track_uris, pd.Series) and len(track_uris) > 100:
-            # Obtener características de audio para varias canciones (más de 100)
-            # Dividir la lista de IDs en sub-listas de máximo 100 IDs
-            track_songs_ids = ["spotify:track:" + track_id for track_id in track_uris]
-            sublists = [
-                track_songs_ids[i : i + 100]
-                for i in range(0, len(track_songs_ids), 100)
-            ]
+        snapshot_id = None
+        sent = 0
+        while True:
+            chunk = list(itertools.islice(uris, chunk_size))
 
-            print("Cantida de registro de 100 a agregar:", len(sublists))
-            for index, sublist in enumerate(sublists):
-                print(index, "->", len(sublist))
-                songs_ids = ",".join(sublist)
-                url = f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks?uris={songs_ids}"
-                response = self.put_requests(url=url)
+            if replace and sent == 0:
+                # Reemplazar el contenido (una lista vacía deja la playlist vacía)
+                response = self.put_requests(url=url, data={"uris": chunk})
+            elif chunk:
+                response = self.post_requests(url=url, data={"uris": chunk})
+            else:
+                break
 
-                print(response)
-            return f"Canciones añadidas a playlist"
+            snapshot_id = response.get("snapshot_id", snapshot_id)
+            sent += len(chunk)
 
-        return "Error en la adicion de canciones"
+            if len(chunk) < chunk_size:
+                break
+
+        return snapshot_id
 
     def track_search(self, song_name: str, artist_name: Union[str, Any] = None):
         # Set the API endpoint URL
-        url = "https://api.spotify.com/v1/search"
+        url = f"{self.base_url}/search"
 
         if song_name and artist_name:
             # Set the query parameters for searching tracks
@@ -253,127 +542,575 @@ class SpotifyAPI:
 
     def playlist_info(self, playlist_id: str):
         # Get requests para obtener data
-        response = self.get_requests(
-            url=f"https://api.spotify.com/v1/playlists/{playlist_id}"
-        )
+        response = self.get_requests(url=f"{self.base_url}/playlists/{playlist_id}")
 
         return response
 
-    def playlist_tracks(self, playlist_id: str, raw_path: str):
+    def iter_playlist_pages(
+        self,
+        playlist_id: str,
+        raw_path: str,
+        snapshot_id: Optional[str] = None,
+        offset: int = 0,
+    ) -> Iterator[Dict]:
+        """
+        Itera sobre las páginas de tracks de una playlist a medida que llegan,
+        guardando cada página en bruto en formato JSON, o en un único archivo NDJSON
+        comprimido si `raw_archive` está configurado.
+
+        Con `offset`, las páginas anteriores se leen de los archivos JSON ya
+        guardados en `raw_path` y solo se piden a la API las siguientes. Si hay un
+        `RunManifest` configurado, se registra el avance después de guardar cada
+        página en formato JSON.
+
+        Parameters:
+            playlist_id (str): ID de la playlist de Spotify.
+            raw_path (str): Directorio donde se guarda la data en bruto.
+            snapshot_id (Optional[str]): Snapshot de la playlist, usado para revalidar la caché.
+            offset (int): Offset desde el que se reanuda una extracción interrumpida.
+
+        Yields:
+            Dict: La respuesta JSON de cada página.
+        """
         # Configurar los parámetros de la consulta
-        offset, limit = 0, 100
-        playlist_data = []
+        limit = 100
+        resume_offset = offset
+
+        # Páginas guardadas por una ejecución interrumpida
+        if resume_offset:
+            try:
+                saved_pages = self.load_raw_pages(raw_path, resume_offset, limit)
+            except FileNotFoundError:
+                # Si falta alguna página en disco se empieza de cero
+                saved_pages = []
+                offset = resume_offset = 0
+
+            response = None
+            for response in saved_pages:
+                yield response
+
+            if response is not None and response["next"] is None:
+                return
+
+        def fetch_pages() -> Iterator[Dict]:
+            nonlocal offset
+
+            while True:
+                params = {"offset": offset, "limit": limit}
+
+                with self.profile_stage("fetch_pages", playlist_id):
+                    response = self.get_requests(
+                        url=f"{self.base_url}/playlists/{playlist_id}/tracks",
+                        params=params,
+                        snapshot_id=snapshot_id,
+                    )
+                offset += limit
+
+                yield response
+
+                # Si no hay más tracks en la playlist, terminar el bucle
+                if response["next"] is None:
+                    break
+
+        checkpoint = self.manifest is not None and not self.raw_archive
+        try:
+            for response in self.save_raw_pages(
+                fetch_pages(), raw_path, limit, playlist_id, offset=resume_offset
+            ):
+                if checkpoint:
+                    self.manifest.checkpoint(playlist_id, resume_offset + limit)
+                resume_offset += limit
 
-        while True:
-            params = {"offset": offset, "limit": limit}
+                yield response
 
-            response = self.get_requests(
-                url=f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
-                params=params,
-            )
+        finally:
+            # Si la extracción falla, guardar el avance que aún no se escribió
+            if checkpoint:
+                self.manifest.flush()
+
+    def save_raw_pages(
+        self,
+        pages: Iterable[Dict],
+        raw_path: str,
+        limit: int,
+        playlist_id: Optional[str] = None,
+        offset: int = 0,
+    ) -> Iterator[Dict]:
+        """
+        Guarda cada página en bruto a medida que pasa, en `raw_path/data_<offset>.json`
+        o en un único archivo NDJSON comprimido si `raw_archive` está configurado.
+
+        Parameters:
+            pages (Iterable[Dict]): Respuestas JSON de las páginas, en orden.
+            raw_path (str): Directorio donde se guarda la data en bruto.
+            limit (int): Tamaño de página, usado para nombrar los archivos JSON.
+            playlist_id (Optional[str]): ID de la playlist, para el perfilador.
+            offset (int): Offset de la primera página.
+
+        Yields:
+            Dict: Cada página, sin modificar.
+        """
+        archive = None
+        if self.raw_archive:
+            archive = RawArchiveWriter(self.raw_archive_path(raw_path))
+
+        try:
+            for index, response in enumerate(pages, start=1):
+                # Guardar la data en bruto, en segundo plano si hay archivo NDJSON
+                with self.profile_stage("raw_write", playlist_id):
+                    if archive:
+                        archive.write(response)
+                    else:
+                        raw_data_file_path_temp = (
+                            f"{raw_path}/data_{offset + index * limit}.json"
+                        )
+                        utils.save_raw_json(
+                            json_path=raw_data_file_path_temp,
+                            json_dict=response
+                        )  # fmt: skip
+
+                yield response
+
+        finally:
+            if archive:
+                archive.close()
+
+    def load_raw_pages(self, raw_path: str, offset: int, limit: int) -> Iterator[Dict]:
+        """
+        Lee las páginas guardadas en formato JSON en `raw_path` hasta `offset`
+        (exclusivo), una a la vez.
+
+        Raises:
+            FileNotFoundError: Si falta alguna de las páginas (antes de leer la primera).
+        """
+        paths = [
+            f"{raw_path}/data_{end}.json" for end in range(limit, offset + 1, limit)
+        ]
+
+        for path in paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+
+        def read(path: str) -> Dict:
+            with open(path) as fp:
+                return json.load(fp)
 
+        return map(read, paths)
+
+    def raw_archive_path(self, raw_path: str) -> str:
+        """
+        Ruta del archivo NDJSON comprimido de páginas en bruto dentro de `raw_path`.
+        """
+        return f"{raw_path}/pages.{EXTENSIONS[self.raw_archive]}"
+
+    def playlist_tracks(
+        self,
+        playlist_id: str,
+        raw_path: str,
+        snapshot_id: Optional[str] = None,
+        offset: int = 0,
+    ):
+        playlist_data = []
+
+        for response in self.iter_playlist_pages(
+            playlist_id, raw_path, snapshot_id, offset
+        ):
             # Agregar los tracks a la lista de resultados
             playlist_data += response["items"]
-            offset += limit
 
-            # Guardar la data en bruto en formato JSON
-            raw_data_file_path_temp = f"{raw_path}/data_{offset}.json"
-            utils.save_raw_json(
-                json_path=raw_data_file_path_temp,
-                json_dict=response
-            )  # fmt: skip
+        return playlist_data
 
-            # Si no hay más tracks en la playlist, terminar el bucle
-            if response["next"] is None:
-                break
+    def iter_pages(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        max_workers: int = 4,
+        offset: int = 0,
+    ) -> Iterator[Dict]:
+        """
+        Itera sobre todas las páginas de un endpoint paginado con `offset` y `limit`.
+        La primera página se pide sola para conocer `total`; las siguientes se piden
+        en paralelo, con a lo sumo `2 * max_workers` páginas en vuelo, y se entregan
+        en orden a medida que llegan.
 
-        return playlist_data
+        Parameters:
+            url (str): URL del endpoint.
+            params (Optional[Dict[str, Any]]): Parámetros de consulta adicionales.
+            limit (int): Cantidad de items por página (máximo 50 en `/me/*`).
+            max_workers (int): Cantidad de páginas solicitadas en paralelo.
+            offset (int): Posición del primer item a pedir.
+
+        Yields:
+            Dict: La respuesta JSON de cada página, en orden.
+        """
+        params = params or {}
+
+        def fetch(offset: int) -> Dict:
+            return self.get_requests(
+                url=url, params={**params, "offset": offset, "limit": limit}
+            )
+
+        first_page = fetch(offset)
+        yield first_page
+
+        if first_page["next"] is None:
+            return
+
+        offsets = iter(range(offset + limit, first_page["total"], limit))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = collections.deque(
+                executor.submit(fetch, offset)
+                for offset in itertools.islice(offsets, 2 * max_workers)
+            )
+
+            try:
+                while pending:
+                    response = pending.popleft().result()
+
+                    # Mantener la ventana de páginas en vuelo
+                    for offset in itertools.islice(offsets, 1):
+                        pending.append(executor.submit(fetch, offset))
+
+                    yield response
+
+            finally:
+                # Si se deja de iterar, no pedir las páginas que faltan
+                for future in pending:
+                    future.cancel()
+
+    def iter_current_playlists(self, max_workers: int = 4) -> Iterator[Dict]:
+        """
+        Itera sobre todas las playlists del usuario (`/me/playlists`).
+
+        Yields:
+            Dict: Cada playlist, en orden.
+        """
+        url = f"{self.base_url}/me/playlists"
+        for response in self.iter_pages(url, max_workers=max_workers):
+            yield from response["items"]
 
     def user_current_playlists(self) -> List[Dict]:
-        url = "https://api.spotify.com/v1/me/playlists"
-        response = self.get_requests(url=url)["items"]
+        return list(self.iter_current_playlists())
 
-        return response
+    def iter_saved_tracks(self, max_workers: int = 4) -> Iterator[Dict]:
+        """
+        Itera sobre las páginas de canciones guardadas del usuario (`/me/tracks`).
+        Sus items tienen la misma forma que los de una playlist.
 
-    def playlist_data(self, playlist_id: str) -> None:
+        Yields:
+            Dict: La respuesta JSON de cada página, en orden.
         """
-        Recupera todos los tracks de una playlist de Spotify.
+        url = f"{self.base_url}/me/tracks"
+        yield from self.iter_pages(url, max_workers=max_workers)
+
+    def iter_saved_albums(self, max_workers: int = 4) -> Iterator[Dict]:
+        """
+        Itera sobre las páginas de álbumes guardados del usuario (`/me/albums`).
+
+        Yields:
+            Dict: La respuesta JSON de cada página, en orden.
+        """
+        url = f"{self.base_url}/me/albums"
+        yield from self.iter_pages(url, max_workers=max_workers)
+
+    def album_track_items(self, response: Dict) -> Dict:
+        """
+        Convierte una página de álbumes guardados en una página con items de la
+        misma forma que los de una playlist (`added_at` y `track` con su `album`),
+        para procesarla con `model_data`. Los tracks de un álbum no traen
+        `popularity`, por lo que queda en None.
 
         Parameters:
-            playlist_id (str): ID de la playlist de Spotify.
+            response (Dict): Respuesta JSON de una página de `/me/albums`.
 
         Returns:
-            Lista con todos los tracks de la playlist.
+            Dict: La página con los tracks de sus álbumes en `items`.
+        """
+        items = []
+        for row in response["items"]:
+            album = row["album"]
+            tracks = album["tracks"]["items"]
+
+            # Los álbumes de más de 50 canciones traen solo la primera página
+            if album["tracks"]["next"] is not None:
+                tracks = list(tracks)
+                url = f"{self.base_url}/albums/{album['id']}/tracks"
+                for page in self.iter_pages(url, offset=len(tracks)):
+                    tracks += page["items"]
+
+            album_info = {key: value for key, value in album.items() if key != "tracks"}
+            for track in tracks:
+                items.append(
+                    {
+                        "added_at": row["added_at"],
+                        "track": {"popularity": None, **track, "album": album_info},
+                    }
+                )
+
+        return {**response, "items": items}
+
+    def playlist_paths(self, playlist_name: str) -> Tuple[str, str]:
         """
-        # Obtener el nombre de la playlist
-        self.playlist_name = self.playlist_info(playlist_id=playlist_id)["name"]
+        Crea los directorios `raw_data` y `parquet_data` de una playlist para el dia de ejecucion.
+
+        Parameters:
+            playlist_name (str): Nombre de la playlist de Spotify.
 
+        Returns:
+            Tuple[str, str]: Rutas de los directorios `raw_data` y `parquet_data`.
+        """
         # Crear el directorio principal y los subdirectorios
         today_directory_path = utils.create_directory(directory_path="api_data",
-                                                    subdirectory_name=YEAR_MONTH_DAY)  # fmt: skip
+                                                    subdirectory_name=year_month_day())  # fmt: skip
 
         # Crear directorios para identificar el dia de ejecucion
-        raw_data_today_path = utils.create_directory(directory_path=today_directory_path,
-                                                   subdirectory_name=self.playlist_name)  # fmt: skip
-
-        parquet_data_today_path = utils.create_directory(directory_path=today_directory_path,
-                                                       subdirectory_name=self.playlist_name)  # fmt: skip
+        playlist_today_path = utils.create_directory(directory_path=today_directory_path,
+                                                   subdirectory_name=playlist_name)  # fmt: skip
 
         # Crear un subdirectorio con la fecha actual
-        raw_data_path = utils.create_directory(directory_path=raw_data_today_path,
+        raw_data_path = utils.create_directory(directory_path=playlist_today_path,
                                              subdirectory_name="raw_data")  # fmt: skip
 
-        parquet_data_path = utils.create_directory(directory_path=parquet_data_today_path,
+        parquet_data_path = utils.create_directory(directory_path=playlist_today_path,
                                                  subdirectory_name="parquet_data")  # fmt: skip
 
+        return raw_data_path, parquet_data_path
+
+    def playlist_data(
+        self, playlist_id: str, stream: bool = False, page_window: int = 10
+    ) -> Optional[List[Dict]]:
+        """
+        Recupera todos los tracks de una playlist de Spotify.
+
+        Si hay un `SnapshotState` configurado, la sincronización es incremental: las
+        playlists cuyo `snapshot_id` no cambió se omiten, y en las que cambiaron solo
+        se consultan las características de audio de las canciones nuevas.
+
+        Si hay un `RunManifest` configurado, las playlists ya completadas en la
+        ejecución se omiten y las que quedaron a medias se reanudan desde la última
+        página guardada.
+
+        Parameters:
+            playlist_id (str): ID de la playlist de Spotify.
+            stream (bool): Si es True, las páginas se procesan y escriben en parquet a
+                medida que llegan, sin acumular la playlist completa en memoria.
+            page_window (int): Cantidad de páginas procesadas por lote en modo stream.
+
+        Returns:
+            Lista con todos los tracks de la playlist, o None si la playlist no cambió
+            o se procesó en modo stream.
+        """
+        # Obtener el nombre y el snapshot de la playlist
+        with self.profile_stage("playlist_info", playlist_id):
+            playlist_info = self.playlist_info(playlist_id=playlist_id)
+        self.playlist_name = playlist_info["name"]
+        snapshot_id = playlist_info.get("snapshot_id")
+
+        # Omitir las playlists completadas antes de que se interrumpiera la ejecución
+        if self.manifest and self.manifest.completed(playlist_id, snapshot_id):
+            return None
+
+        # Omitir las playlists que no cambiaron desde la última sincronización
+        previous_path = None
+        if self.snapshots:
+            if self.snapshots.unchanged(playlist_id, snapshot_id):
+                return None
+
+            previous = self.snapshots.get(playlist_id)
+            previous_path = previous["parquet_path"] if previous else None
+
+        # Crear los directorios de salida del dia de ejecucion
+        with self.profile_stage("directories", playlist_id):
+            raw_data_path, parquet_data_path = self.playlist_paths(self.playlist_name)
+
+        # Offset de la última página guardada; el archivo NDJSON se escribe en
+        # segundo plano y no se puede continuar, así que se empieza de cero
+        offset = 0
+        if self.manifest:
+            offset = self.manifest.start(
+                playlist_id, snapshot_id, raw_data_path, parquet_data_path
+            )
+            if self.raw_archive:
+                offset = 0
+
+        if stream:
+            pages = self.iter_playlist_pages(
+                playlist_id=playlist_id,
+                raw_path=raw_data_path,
+                snapshot_id=snapshot_id,
+                offset=offset,
+            )
+            self.stream_model_data(
+                pages=pages,
+                parquet_path=parquet_data_path,
+                page_window=page_window,
+                playlist_id=playlist_id,
+            )
+
+            if self.snapshots:
+                self.snapshots.update(playlist_id, snapshot_id, parquet_data_path)
+
+            if self.manifest:
+                self.manifest.complete(playlist_id)
+
+            return None
+
         # Configurar los parámetros de la consulta
         playlist_data = self.playlist_tracks(
-            playlist_id=playlist_id, raw_path=raw_data_path
+            playlist_id=playlist_id,
+            raw_path=raw_data_path,
+            snapshot_id=snapshot_id,
+            offset=offset,
         )
 
-        self.model_data(playlist_data=playlist_data, parquet_path=parquet_data_path)
+        self.model_data(
+            playlist_data=playlist_data,
+            parquet_path=parquet_data_path,
+            previous_path=previous_path,
+            playlist_id=playlist_id,
+        )
+
+        if self.snapshots:
+            self.snapshots.update(playlist_id, snapshot_id, parquet_data_path)
+
+        if self.manifest:
+            self.manifest.complete(playlist_id)
 
         return playlist_data
 
-    def audio_feature(self, song_id: Union[str, pd.Series]) -> Dict:
+    def library_data(
+        self,
+        source: Literal["saved_tracks", "saved_albums"],
+        stream: bool = False,
+        page_window: int = 10,
+    ) -> Optional[List[Dict]]:
+        """
+        Extrae la biblioteca del usuario (canciones o álbumes guardados) con el mismo
+        proceso que una playlist: las páginas se guardan en bruto en
+        `api_data/<fecha>/<source>/raw_data` y los tracks se procesan con `model_data`
+        o, con `stream`, con `stream_model_data` a medida que llegan las páginas. Las
+        páginas de álbumes se guardan convertidas con `album_track_items`, con la
+        forma de las páginas de una playlist.
+
+        Parameters:
+            source (str): `saved_tracks` (`/me/tracks`) o `saved_albums` (`/me/albums`).
+            stream (bool): Si es True, las páginas se procesan por lotes sin acumular
+                la biblioteca completa en memoria.
+            page_window (int): Cantidad de páginas procesadas por lote en modo stream.
+
+        Returns:
+            Lista con todos los tracks de la biblioteca, o None en modo stream o si ya
+            se completó en la ejecución (ver `RunManifest`).
+        """
+        if self.manifest and self.manifest.completed(source):
+            return None
+
+        if source == "saved_tracks":
+            pages = self.iter_saved_tracks()
+        elif source == "saved_albums":
+            pages = self.iter_saved_albums()
+        else:
+            raise ValueError("source debe ser 'saved_tracks' o 'saved_albums'")
+
+        with self.profile_stage("directories", source):
+            raw_data_path, parquet_data_path = self.playlist_paths(source)
+
+        # La biblioteca se reanuda completa: sus páginas se piden en paralelo
+        if self.manifest:
+            self.manifest.start(source, None, raw_data_path, parquet_data_path)
+
+        # Los álbumes se guardan ya convertidos (con los tracks de las páginas
+        # siguientes de cada álbum), para que `replay.py` los procese como playlists
+        if source == "saved_albums":
+            pages = map(self.album_track_items, pages)
+        pages = self.save_raw_pages(pages, raw_data_path, limit=50, playlist_id=source)
+
+        if stream:
+            self.stream_model_data(
+                pages=pages,
+                parquet_path=parquet_data_path,
+                page_window=page_window,
+                playlist_id=source,
+            )
+
+        else:
+            library_data = [item for response in pages for item in response["items"]]
+
+            self.model_data(
+                playlist_data=library_data,
+                parquet_path=parquet_data_path,
+                playlist_id=source,
+            )
+
+        if self.manifest:
+            self.manifest.complete(source)
+
+        return None if stream else library_data
+
+    def audio_feature(
+        self, song_id: Union[str, Iterable[str]], max_workers: int = 4
+    ) -> pd.DataFrame:
         """
         Obtiene las características de audio de una o varias canciones de Spotify.
+        Los IDs se piden en lotes de 100 que se envían en paralelo; si hay un
+        `FeatureStore` configurado, solo se consultan a la API los IDs que no estén
+        almacenados.
 
         Parámetros:
-            - song_id (Union[str, List[str]]): ID o lista de IDs de la canción(es) de Spotify.
+            - song_id (Union[str, Iterable[str]]): ID o IDs de la canción(es) de Spotify.
+            - max_workers (int): Cantidad de lotes enviados en paralelo.
 
         Retorna:
-            - Dict: Diccionario con las características de audio de la canción (o canciones).
+            - pd.DataFrame: Una fila por canción encontrada, en el orden de entrada, con
+              la columna `song_id` y sus características de audio.
         """
+        import pandas as pd
 
-        if isinstance(song_id, str):
-            # Obtener características de audio para una sola canción
-            url = f"https://api.spotify.com/v1/audio-features/{song_id}"
-            audio_features = self.get_requests(url)
+        song_ids = [song_id] if isinstance(song_id, str) else list(song_id)
 
-        elif isinstance(song_id, pd.Series) and len(song_id) <= 100:
-            # Obtener características de audio para varias canciones (hasta 100)
-            url = f"https://api.spotify.com/v1/audio-features?ids={','.join(song_id)}"
-            audio_features = self.get_requests(url)["audio_features"]
+        # Características ya almacenadas de ejecuciones o playlists anteriores
+        features = self.feature_store.get_many(song_ids) if self.feature_store else {}
+        missing_ids = [
+            track_id for track_id in dict.fromkeys(song_ids) if track_id not in features
+        ]
 
-        elif isinstance(song_id, pd.Series) and len(song_id) > 100:
-            # Obtener características de audio para varias canciones (más de 100)
-            # Dividir la lista de IDs en sub-listas de máximo 100 IDs
-            sublists = [song_id[i : i + 100] for i in range(0, len(song_id), 100)]
+        # Dividir la lista de IDs faltantes en sub-listas de máximo 100 IDs
+        sublists = [missing_ids[i : i + 100] for i in range(0, len(missing_ids), 100)]
 
-            # Obtener características de audio para cada sub-lista de IDs
-            audio_features = [
-                feature
-                for sublist in sublists
-                for feature in self.get_requests(
-                    f"https://api.spotify.com/v1/audio-features?ids={','.join(sublist)}"
-                )["audio_features"]
-                if feature is not None
-            ]
+        def fetch(sublist: List[str]) -> List[Dict]:
+            response = self.get_requests(
+                url=f"{self.base_url}/audio-features",
+                params={"ids": ",".join(sublist)},
+            )
+
+            return [feature for feature in response["audio_features"] if feature]
+
+        # Obtener las características de cada sub-lista en paralelo
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for fetched in executor.map(fetch, sublists):
+                features.update({feature["id"]: feature for feature in fetched})
 
-        return audio_features
+                if self.feature_store:
+                    self.feature_store.put_many(fetched)
 
-    def model_data(self, playlist_data: List[Dict], parquet_path: str) -> None:
+        # Conservar el orden de entrada y omitir las canciones sin características
+        audio_features = pd.DataFrame(
+            [features[track_id] for track_id in song_ids if track_id in features],
+            columns=None if features else ["id"],
+        )
+
+        return audio_features.rename(columns={"id": "song_id"})
+
+    def model_data(
+        self,
+        playlist_data: List[Dict],
+        parquet_path: str,
+        previous_path: Optional[str] = None,
+        playlist_id: Optional[str] = None,
+        run_date: Optional[str] = None,
+    ) -> None:
         """
         Procesa los datos de la playlist y guarda la información de los álbumes, artistas,
         canciones y sus características en archivos parquet.
@@ -381,44 +1118,188 @@ class SpotifyAPI:
         Parameters:
             playlist_data (List[Dict]): Lista de diccionarios con la información de los tracks de la playlist.
             parquet_path (str): Ruta del directorio donde se guardarán los archivos parquet.
+            previous_path (Optional[str]): Directorio parquet de la sincronización anterior. Si se
+                indica, se reutilizan sus características de audio y solo se consultan las de las
+                canciones agregadas; las filas de canciones eliminadas se descartan.
+            playlist_id (Optional[str]): ID de la playlist. Si hay un `PartitionedDataset`
+                configurado, las tablas se agregan a su partición en lugar de `parquet_path`.
+            run_date (Optional[str]): Fecha de la partición del dataset. Default: la fecha actual.
 
         Returns:
             None
         """
+        import pandas as pd
 
         # Obteniendo informacion de los albumes, artistas y canciones
-        # que estan en la playlist
-        album_df = pd.DataFrame.from_dict(utils.album_data(playlist_data))
-        artist_df = pd.DataFrame.from_dict(utils.artist_data(playlist_data))
-        song_df = pd.DataFrame.from_dict(utils.songs_data(playlist_data))
-
-        # Eliminando duplicados por id
-        album_df = album_df.drop_duplicates(subset="album_id")
-        artist_df = artist_df.drop_duplicates(subset="artist_id")
-        song_df = song_df.drop_duplicates(subset="song_id")
+        # que estan en la playlist, en una sola pasada
+        with self.profile_stage("flatten", playlist_id):
+            album_df, artist_df, song_df = utils.flatten_frames(playlist_data)
+
+            # Eliminando duplicados por id
+            album_df = album_df.drop_duplicates(subset="album_id")
+            artist_df = artist_df.drop_duplicates(subset="artist_id")
+            song_df = song_df.drop_duplicates(subset="song_id")
+
+        # Reutilizando las características de la sincronización anterior
+        # de las canciones que siguen en la playlist
+        previous_features_path = f"{previous_path}/songs_features.parquet"
+        if previous_path and os.path.exists(previous_features_path):
+            with self.profile_stage("previous_features", playlist_id):
+                previous_features_df = pd.read_parquet(previous_features_path)
+                previous_features_df = previous_features_df[
+                    previous_features_df["song_id"].isin(song_df["song_id"])
+                ]
+        else:
+            previous_features_df = pd.DataFrame(columns=["song_id"])
 
         # Obteniendo las características de cada canción
-        # que se encuentra en la playlist
-        songs_features = self.audio_feature(song_id=song_df["song_id"])
-        songs_features_df = pd.DataFrame(songs_features)
-        songs_features_df = songs_features_df.rename(columns={"id": "song_id"})
+        # que se encuentra en la playlist (solo las nuevas)
+        new_song_ids = song_df.loc[
+            ~song_df["song_id"].isin(previous_features_df["song_id"]), "song_id"
+        ]
+        songs_features_df = previous_features_df
+        if len(new_song_ids) > 0:
+            with self.profile_stage("audio_features", playlist_id):
+                new_features_df = self.audio_feature(song_id=new_song_ids)
+            songs_features_df = pd.concat(
+                [previous_features_df, new_features_df], ignore_index=True
+            )
+
+        frames = {
+            "albums": album_df,
+            "artists": artist_df,
+            "songs": song_df,
+            "songs_features": songs_features_df,
+        }
 
         # Uniendo los datos para tener un solo archivo consolidado
-        df_1 = pd.merge(left=song_df, right=songs_features_df, on="song_id")
-        df_2 = pd.merge(left=df_1, right=album_df, on="album_id")
-        df_merge_data = pd.merge(left=df_2, right=artist_df, on="artist_id")
-
-        # Definiendo paths para guardando archivos
-        album_path = f"{parquet_path}/albums.parquet"
-        artist_path = f"{parquet_path}/artists.parquet"
-        song_path = f"{parquet_path}/songs.parquet"
-        songs_features_path = f"{parquet_path}/songs_features.parquet"
-        df_merge_data_path = f"{parquet_path}/merge_data.parquet"
-
-        album_df.to_parquet(album_path)
-        artist_df.to_parquet(artist_path)
-        song_df.to_parquet(song_path)
-        songs_features_df.to_parquet(songs_features_path)
-        df_merge_data.to_parquet(df_merge_data_path)
+        if self.merge_data:
+            with self.profile_stage("merge", playlist_id):
+                frames["merge_data"] = utils.merge_model_data(
+                    song_df, songs_features_df, album_df, artist_df
+                )
+
+        with self.profile_stage("write", playlist_id):
+            if self.dataset and playlist_id:
+                # Reemplazar la partición de una ejecución o reproceso anterior
+                self.dataset.write(
+                    frames,
+                    run_date=run_date or year_month_day(),
+                    playlist_id=playlist_id,
+                    replace=True,
+                )
+
+                return True
+
+            # Guardando cada tabla en su archivo parquet
+            for name, df in frames.items():
+                df.to_parquet(f"{parquet_path}/{name}.parquet")
 
         return True
+
+    def stream_model_data(
+        self,
+        pages: Iterable[Dict],
+        parquet_path: str,
+        page_window: int = 10,
+        playlist_id: Optional[str] = None,
+    ) -> int:
+        """
+        Versión en streaming de `model_data`: procesa las páginas de la playlist en
+        lotes de `page_window` páginas y escribe cada lote como un row group de los
+        mismos cinco archivos parquet. La memoria usada queda acotada por el lote.
+
+        Parameters:
+            pages (Iterable[Dict]): Respuestas JSON de las páginas de tracks.
+            parquet_path (str): Ruta del directorio donde se guardarán los archivos parquet.
+            page_window (int): Cantidad de páginas por lote.
+            playlist_id (Optional[str]): ID de la playlist. Si hay un `PartitionedDataset`
+                configurado, cada lote se agrega a su partición (ver `PartitionedDataset.compact`).
+
+        Returns:
+            int: Cantidad de canciones escritas.
+        """
+        import pandas as pd
+
+        from classes.writers import ParquetStreamWriter
+
+        names = ["albums", "artists", "songs", "songs_features", "merge_data"]
+        writers = {
+            name: ParquetStreamWriter(f"{parquet_path}/{name}.parquet")
+            for name in names
+        }
+
+        # IDs ya escritos en lotes anteriores
+        seen_albums, seen_artists, seen_songs = set(), set(), set()
+        use_dataset = self.dataset is not None and playlist_id is not None
+        run_date = year_month_day()
+
+        # Los lotes se agregan a la partición, que se vacía antes del primero
+        if use_dataset:
+            self.dataset.clear(run_date, playlist_id)
+
+        def flush(window: List[Dict]) -> None:
+            with self.profile_stage("flatten", playlist_id):
+                album_df, artist_df, song_df = utils.flatten_frames(window)
+
+                if song_df.empty:
+                    return
+
+                # Eliminando duplicados por id, dentro del lote y con lotes anteriores
+                album_df = album_df.drop_duplicates(subset="album_id")
+                artist_df = artist_df.drop_duplicates(subset="artist_id")
+                song_df = song_df.drop_duplicates(subset="song_id")
+                song_df = song_df[~song_df["song_id"].isin(seen_songs)]
+
+            with self.profile_stage("audio_features", playlist_id):
+                songs_features_df = self.audio_feature(song_id=song_df["song_id"])
+
+            # Uniendo los datos del lote
+            if self.merge_data:
+                with self.profile_stage("merge", playlist_id):
+                    df_merge_data = utils.merge_model_data(
+                        song_df, songs_features_df, album_df, artist_df
+                    )
+
+            album_df = album_df[~album_df["album_id"].isin(seen_albums)]
+            artist_df = artist_df[~artist_df["artist_id"].isin(seen_artists)]
+
+            frames = {
+                "albums": album_df,
+                "artists": artist_df,
+                "songs": song_df,
+                "songs_features": songs_features_df,
+            }
+            if self.merge_data:
+                frames["merge_data"] = df_merge_data
+
+            with self.profile_stage("write", playlist_id):
+                if use_dataset:
+                    self.dataset.write(
+                        frames, run_date=run_date, playlist_id=playlist_id
+                    )
+                else:
+                    for name, df in frames.items():
+                        writers[name].write(df)
+
+            seen_albums.update(album_df["album_id"])
+            seen_artists.update(artist_df["artist_id"])
+            seen_songs.update(song_df["song_id"])
+
+        try:
+            window, window_pages = [], 0
+            for page in pages:
+                window += page["items"]
+                window_pages += 1
+
+                if window_pages >= page_window:
+                    flush(window)
+                    window, window_pages = [], 0
+
+            flush(window)
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return len(seen_songs)
@@ -0,0 +1,62 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class SnapshotState:
+    """
+    Registra el último `snapshot_id` sincronizado de cada playlist y la ruta de
+    sus archivos parquet, para la sincronización incremental.
+
+    Parameters:
+        path (str): Ruta del archivo JSON con el estado.
+    """
+
+    def __init__(self, path: str = "api_data/snapshots.json"):
+        self.path = path
+        self._lock = threading.Lock()
+
+        try:
+            with open(path) as fp:
+                self.state = json.load(fp)
+        except FileNotFoundError:
+            self.state = {}
+
+    def get(self, playlist_id: str) -> Optional[Dict[str, str]]:
+        """
+        Devuelve el último estado sincronizado de una playlist, o None si no existe.
+        """
+        with self._lock:
+            return self.state.get(playlist_id)
+
+    def unchanged(self, playlist_id: str, snapshot_id: str) -> bool:
+        """
+        Indica si la playlist no cambió desde la última sincronización y sus
+        archivos parquet siguen en disco.
+        """
+        previous = self.get(playlist_id)
+
+        return (
+            previous is not None
+            and previous["snapshot_id"] == snapshot_id
+            and os.path.isdir(previous["parquet_path"])
+        )
+
+    def update(self, playlist_id: str, snapshot_id: str, parquet_path: str) -> None:
+        """
+        Guarda el nuevo estado de una playlist. El archivo se escribe de forma atómica.
+        """
+        with self._lock:
+            self.state[playlist_id] = {
+                "snapshot_id": snapshot_id,
+                "parquet_path": parquet_path,
+            }
+
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as fp:
+                json.dump(self.state, fp, indent=4)
+
+            os.replace(temp_path, self.path)
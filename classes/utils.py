@@ -1,8 +1,14 @@
+from __future__ import annotations
+
 import json
 import os
 import re
+import unicodedata
 from pathlib import Path
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def check_date():
@@ -177,6 +183,165 @@ def songs_data(playlist_data: List[str]) -> List[Dict]:
     return songs_data
 
 
+def flatten_playlist(
+    playlist_data: List[Dict],
+) -> Tuple[Dict[str, List], Dict[str, List], Dict[str, List]]:
+    """
+    Recorre una sola vez los datos de una playlist de Spotify y extrae a la vez las
+    columnas de álbumes, artistas y canciones. Equivale a `album_data`,
+    `artist_data` y `songs_data`, pero en formato columnar.
+
+    Parameters:
+        playlist_data (List[Dict]): Lista de diccionarios con datos de una playlist de Spotify
+
+    Returns:
+        Tuple[Dict[str, List], Dict[str, List], Dict[str, List]]: Columnas de álbumes,
+        artistas y canciones, listas para `pd.DataFrame`.
+    """
+
+    albums = {
+        "album_id": [],
+        "album_name": [],
+        "album_release_date": [],
+        "album_total_tracks": [],
+        "album_url": [],
+    }
+    artists = {
+        "artist_id": [],
+        "artist_name": [],
+        "artist_type": [],
+        "artist_external_url": [],
+    }
+    songs = {
+        "song_id": [],
+        "song_name": [],
+        "song_duration_ms": [],
+        "song_url": [],
+        "song_popularity": [],
+        "song_explicit": [],
+        "song_added": [],
+        "album_id": [],
+        "artist_id": [],
+    }
+
+    # Referencias locales a los append para evitar búsquedas en cada fila
+    album_id, album_name, album_release_date, album_total_tracks, album_url = (
+        column.append for column in albums.values()
+    )
+    artist_id, artist_name, artist_type, artist_url = (
+        column.append for column in artists.values()
+    )
+    (
+        song_id,
+        song_name,
+        song_duration_ms,
+        song_url,
+        song_popularity,
+        song_explicit,
+        song_added,
+        song_album_id,
+        song_artist_id,
+    ) = (column.append for column in songs.values())
+
+    for row in playlist_data:
+        track = row["track"]
+        if track is None:
+            continue
+
+        album = track["album"]
+        album_id(album["id"])
+        album_name(album["name"])
+        album_release_date(album["release_date"])
+        album_total_tracks(album["total_tracks"])
+        album_url(album["external_urls"]["spotify"])
+
+        for artist in track["artists"]:
+            artist_id(artist["id"])
+            artist_name(artist["name"])
+            artist_type(artist["type"])
+            artist_url(artist["external_urls"]["spotify"])
+
+        song_id(track["id"])
+        song_name(track["name"])
+        song_duration_ms(track["duration_ms"])
+        song_url(track["external_urls"]["spotify"])
+        song_popularity(track["popularity"])
+        song_explicit(track["explicit"])
+        song_added(row["added_at"])
+        song_album_id(album["id"])
+        song_artist_id(album["artists"][0]["id"])
+
+    return albums, artists, songs
+
+
+def flatten_frames(
+    playlist_data: List[Dict],
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    `flatten_playlist` como DataFrames de álbumes, artistas y canciones.
+
+    Sin canciones (una playlist vacía o solo con tracks nulos) las columnas vacías
+    quedan con tipo `object` en lugar de `float64`, de modo que sus llaves se
+    pueden unir con las de las otras tablas en `merge_model_data`.
+
+    Parameters:
+        playlist_data (List[Dict]): Lista de diccionarios con datos de una playlist de Spotify
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: Álbumes, artistas y canciones.
+    """
+    import pandas as pd
+
+    return tuple(
+        pd.DataFrame(columns, dtype=None if next(iter(columns.values())) else object)
+        for columns in flatten_playlist(playlist_data)
+    )
+
+
+def merge_model_data(
+    song_df: pd.DataFrame,
+    songs_features_df: pd.DataFrame,
+    album_df: pd.DataFrame,
+    artist_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Une canciones, características de audio, álbumes y artistas en una sola tabla.
+
+    Cada tabla de la derecha se indexa una vez por su llave y se une con `join`
+    sobre ese índice, en lugar de encadenar `pd.merge` sobre columnas. El resultado
+    es el mismo que el de los `pd.merge` internos: una fila por canción que tenga
+    características, álbum y artista, en el orden de `song_df`.
+
+    Parameters:
+        song_df (pd.DataFrame): Canciones, sin duplicados por `song_id`.
+        songs_features_df (pd.DataFrame): Características de audio por `song_id`.
+        album_df (pd.DataFrame): Álbumes, sin duplicados por `album_id`.
+        artist_df (pd.DataFrame): Artistas, sin duplicados por `artist_id`.
+
+    Returns:
+        pd.DataFrame: Tabla consolidada.
+    """
+    # Sin canciones no hay filas que unir; las llaves vacías pueden ser float64
+    if song_df.empty:
+        columns = list(song_df.columns)
+        for df in (songs_features_df, album_df, artist_df):
+            columns += [column for column in df.columns if column not in columns]
+
+        return song_df.reindex(columns=columns).reset_index(drop=True)
+
+    merge_data = song_df.join(
+        songs_features_df.set_index("song_id"), on="song_id", how="inner"
+    )
+    merge_data = merge_data.join(
+        album_df.set_index("album_id"), on="album_id", how="inner"
+    )
+    merge_data = merge_data.join(
+        artist_df.set_index("artist_id"), on="artist_id", how="inner"
+    )
+
+    return merge_data.reset_index(drop=True)
+
+
 def user_current_playlist_data(current_playlists: List[Dict]) -> List[Dict]:
     """
     Toma una lista de diccionarios de las playlist de Spotify del usuario
@@ -223,3 +388,51 @@ def user_current_playlist_get_id(playlists, playlist_name):
 
     # Si se recorrió toda la lista y no se encontró el nombre de la lista de reproducción, se devuelve None
     return None
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un título o nombre de artista para compararlo de forma aproximada:
+    minúsculas, sin acentos, sin artistas invitados ni texto entre paréntesis y
+    sin signos de puntuación.
+
+    Parameters:
+        text (str): Texto a normalizar.
+
+    Returns:
+        str: Texto normalizado.
+    """
+
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+
+    # Quitar artistas invitados y texto entre paréntesis o corchetes
+    text = re.split(r"\s+(?:featuring|feat\.?|ft\.?)\s+", text)[0]
+    text = re.sub(r"[\(\[].*?[\)\]]", " ", text)
+
+    # Dejar solo letras y números separados por un espacio
+    return " ".join(re.findall(r"\w+", text))
+
+
+def percentiles(
+    values: Iterable[float], quantiles: Tuple[int, ...] = (50, 95, 99)
+) -> Dict[str, float]:
+    """
+    Calcula percentiles por el método del rango más cercano.
+
+    Parameters:
+        values (Iterable[float]): Valores a resumir.
+        quantiles (Tuple[int, ...]): Percentiles a calcular.
+
+    Returns:
+        Dict[str, float]: Valor de cada percentil con llaves `p50`, `p95`, ...
+    """
+
+    ordered = sorted(values)
+    if not ordered:
+        return {f"p{q}": 0.0 for q in quantiles}
+
+    return {
+        f"p{q}": ordered[min(len(ordered) - 1, max(0, -(-q * len(ordered) // 100) - 1))]
+        for q in quantiles
+    }
@@ -0,0 +1,58 @@
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class ParquetStreamWriter:
+    """
+    Escribe un archivo parquet de forma incremental, un row group por lote.
+
+    El esquema se toma del primer lote no vacío; los lotes siguientes se
+    convierten a ese mismo esquema.
+
+    Parameters:
+        path (str): Ruta del archivo parquet.
+        compression (str): Códec de compresión de parquet.
+    """
+
+    def __init__(self, path: str, compression: str = "snappy"):
+        self.path = path
+        self.compression = compression
+        self.rows = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Agrega un lote de filas al archivo como un nuevo row group.
+        """
+        if df.empty:
+            return
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._writer = pq.ParquetWriter(
+                self.path, table.schema, compression=self.compression
+            )
+        else:
+            table = pa.Table.from_pandas(
+                df, schema=self._writer.schema, preserve_index=False
+            )
+
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        """
+        Cierra el archivo. Si no se escribió ningún lote, no se crea el archivo.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
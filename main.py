@@ -1,25 +1,196 @@
+import argparse
+
 from tqdm import tqdm
 
 from classes import utils
-from classes.spotify import SpotifyAPI
+from classes.cache import ResponseCache
+from classes.feature_store import FeatureStore
+from classes.manifest import RunManifest
+from classes.metrics import RequestMetrics
+from classes.scheduler import RequestScheduler
+from classes.spotify import SpotifyAPI, year_month_day
+from classes.sync import SnapshotState
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Extraer data de las playlists del usuario"
+    )
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Extraer las playlists de forma concurrente")  # fmt: skip
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Cantidad maxima de playlists extraidas a la vez")  # fmt: skip
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="Solicitudes por segundo permitidas a la API")  # fmt: skip
+    parser.add_argument("--cache", action="store_true",
+                        help="Usar la cache persistente de respuestas de la API")  # fmt: skip
+    parser.add_argument("--incremental", action="store_true",
+                        help="Omitir las playlists cuyo snapshot_id no cambio")  # fmt: skip
+    parser.add_argument("--no-feature-store", dest="feature_store", action="store_false",
+                        help="No reutilizar las caracteristicas de audio ya descargadas")  # fmt: skip
+    parser.add_argument("--stream", action="store_true",
+                        help="Escribir los parquet por lotes de paginas a medida que llegan")  # fmt: skip
+    parser.add_argument("--page-window", type=int, default=10,
+                        help="Paginas por lote en modo --stream")  # fmt: skip
+    parser.add_argument("--output", choices=["files", "dataset"], default="files",
+                        help="Archivos parquet por playlist o dataset particionado")  # fmt: skip
+    parser.add_argument("--compression", default="zstd",
+                        help="Compresion de parquet en --output dataset")  # fmt: skip
+    parser.add_argument("--raw-archive", choices=["gzip", "zstd"], default=None,
+                        help="Guardar las paginas en bruto como un NDJSON comprimido por playlist")  # fmt: skip
+    parser.add_argument("--no-merge", dest="merge_data", action="store_false",
+                        help="No generar la tabla consolidada merge_data")  # fmt: skip
+    parser.add_argument("--saved-tracks", action="store_true",
+                        help="Extraer tambien las canciones guardadas del usuario")  # fmt: skip
+    parser.add_argument("--saved-albums", action="store_true",
+                        help="Extraer tambien los albumes guardados del usuario")  # fmt: skip
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="No reanudar la ejecucion interrumpida del dia; empezar de cero")  # fmt: skip
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="Guardar las metricas por endpoint como JSON en PATH")  # fmt: skip
+    parser.add_argument("--prometheus", default=None, metavar="PATH",
+                        help="Guardar las metricas por endpoint en formato Prometheus en PATH")  # fmt: skip
+    parser.add_argument("--profile", action="store_true",
+                        help="Medir tiempo, CPU y memoria por etapa de cada playlist")  # fmt: skip
+
+    args = parser.parse_args()
 
-spotify = SpotifyAPI()
+    # La extraccion concurrente arma cada playlist completa en memoria
+    if args.use_async and args.stream:
+        parser.error("--stream y --page-window no se admiten junto con --async")
+
+    # Sin `zstandard` el error aparecería recién al cerrar el archivo de cada playlist
+    if args.raw_archive == "zstd":
+        from classes.archive import zstandard
+
+        if zstandard is None:
+            parser.error("--raw-archive zstd requiere el paquete `zstandard`")
+
+    return args
 
 
 if __name__ == "__main__":
-    # URL's de diversas Playlist a ejecutar
+    args = parse_args()
+
+    # La autenticación se hace recién en la primera solicitud a la API
+    spotify = SpotifyAPI(scheduler=RequestScheduler(rate=args.rate))
+
+    if args.cache:
+        spotify.cache = ResponseCache()
+
+    if args.incremental:
+        spotify.snapshots = SnapshotState()
+
+    if args.feature_store:
+        spotify.feature_store = FeatureStore()
+
+    if args.metrics or args.prometheus:
+        spotify.metrics = RequestMetrics()
+
+    if args.profile:
+        from classes.profiler import StageProfiler
+
+        spotify.profiler = StageProfiler()
+
+    spotify.raw_archive = args.raw_archive
+    spotify.merge_data = args.merge_data
+
+    # Avance de la ejecucion del dia, para reanudarla si se interrumpe
+    manifest_path = f"api_data/{year_month_day()}/manifest.json"
+    if args.resume:
+        spotify.manifest = RunManifest(manifest_path)
+        if spotify.manifest.resumed:
+            print(f"Reanudando la ejecucion interrumpida ({manifest_path})")
+
+    if args.output == "dataset":
+        from classes.dataset import PartitionedDataset
+
+        spotify.dataset = PartitionedDataset(compression=args.compression)
+
+    # URL's de todas las playlists del usuario; las paginas se piden en paralelo
     current_user_playlist_data = utils.user_current_playlist_data(
         current_playlists=spotify.user_current_playlists()
     )
 
-    for row in tqdm(
-        current_user_playlist_data, desc="Extracting Spotify data from API", ncols=120
-    ):
-        # Datos de las canciones que tienen la playlist a buscar por ID
-        playlist_id = row["playlist_id"]
-        playlist_name = row["playlist_name"].strip().ljust(28)
+    failed = False
+
+    if args.use_async:
+        from classes.async_spotify import AsyncSpotifyAPI
+
+        # Extraer las playlists de forma concurrente
+        async_spotify = AsyncSpotifyAPI(spotify, concurrency=args.concurrency)
+        playlist_ids = [row["playlist_id"] for row in current_user_playlist_data]
+
+        with tqdm(
+            total=len(playlist_ids), desc="Extracting Spotify data from API", ncols=120
+        ) as progress:
+            results = async_spotify.run(playlist_ids, progress=progress)
+
+        for playlist_id, result in results.items():
+            if isinstance(result, Exception):
+                failed = True
+                print(f"{playlist_id} no pudo ser extraida: {result}")
+
+    else:
+        for row in tqdm(
+            current_user_playlist_data,
+            desc="Extracting Spotify data from API",
+            ncols=120,
+        ):
+            # Datos de las canciones que tienen la playlist a buscar por ID
+            playlist_id = row["playlist_id"]
+            playlist_name = row["playlist_name"].strip().ljust(28)
+
+            # Extraer data de Playlist; un error no detiene el resto de la ejecucion
+            try:
+                spotify.playlist_data(
+                    playlist_id=playlist_id,
+                    stream=args.stream,
+                    page_window=args.page_window,
+                )
+            except Exception as e:
+                failed = True
+                print(f"{playlist_name} no pudo ser extraida: {e}")
+
+            # print(f"{playlist_name} extraida con éxito!")
+
+    # Biblioteca del usuario, procesada por paginas a medida que llegan
+    for source in ["saved_tracks", "saved_albums"]:
+        if not getattr(args, source):
+            continue
+
+        try:
+            spotify.library_data(
+                source=source, stream=args.stream, page_window=args.page_window
+            )
+        except Exception as e:
+            failed = True
+            print(f"{source} no pudo ser extraida: {e}")
+
+    # Con errores, la siguiente ejecucion reintenta solo lo que falto
+    if spotify.manifest and not failed:
+        spotify.manifest.finish()
+
+    # Reintentos, esperas por limitacion de tasa y tiempo dormido
+    print("Scheduler:", spotify.scheduler.stats())
+
+    if spotify.cache:
+        print("Cache:", spotify.cache.stats())
+
+    # Llamadas, latencias, bytes, reintentos y aciertos de cache por endpoint
+    if args.metrics:
+        spotify.metrics.save_json(args.metrics)
+
+    if args.prometheus:
+        spotify.metrics.save_prometheus(args.prometheus)
 
-        # Extraer data de Playlist
-        spotify.playlist_data(playlist_id=playlist_id)
+    # Desglose por etapa: red, escritura en bruto, pandas o parquet
+    if spotify.profiler:
+        print(spotify.profiler.summary())
+        spotify.profiler.close()
 
-        # print(f"{playlist_name} extraida con éxito!")
+    # Unir los archivos pequeños de cada particion del dataset
+    if spotify.dataset:
+        report = spotify.dataset.compact()
+        for partition, error in report["errors"].items():
+            print(f"{partition} no pudo ser compactada: {error}")
@@ -0,0 +1,67 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from tqdm import tqdm
+
+from classes.replay import find_raw_playlists, replay_playlist
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Reprocesar la data en bruto guardada sin consultar la API"
+    )
+    parser.add_argument("--root", default="api_data",
+                        help="Directorio con la data extraida")  # fmt: skip
+    parser.add_argument("--output-root", default="replay_data",
+                        help="Directorio de salida de los parquet")  # fmt: skip
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Permitir --output-root igual a --root (reemplaza los parquet originales)")  # fmt: skip
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Cantidad de procesos. Default: cantidad de nucleos")  # fmt: skip
+    parser.add_argument("--feature-store", default="api_data/audio_features.sqlite",
+                        help="Almacen de caracteristicas de audio")  # fmt: skip
+    parser.add_argument("--dataset-root", default=None,
+                        help="Escribir en un dataset particionado en lugar de archivos por playlist")  # fmt: skip
+
+    args = parser.parse_args()
+
+    # No reemplazar los parquet de la extracción original sin pedirlo
+    if os.path.abspath(args.output_root) == os.path.abspath(args.root):
+        if not args.overwrite:
+            parser.error("--output-root es igual a --root; use --overwrite")
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    playlists = find_raw_playlists(args.root)
+    replay = partial(
+        replay_playlist,
+        output_root=args.output_root,
+        feature_store_path=args.feature_store,
+        dataset_root=args.dataset_root,
+    )
+
+    # Reprocesar las playlists en paralelo, un proceso por nucleo
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(replay, playlist): playlist for playlist in playlists
+        }
+
+        for future in tqdm(
+            as_completed(futures),
+            total=len(futures),
+            desc="Replaying raw Spotify data",
+            ncols=120,
+        ):
+            playlist = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(
+                    f"{playlist.run_date}/{playlist.playlist_name} no pudo ser reprocesada: {e}"
+                )